@@ -0,0 +1,51 @@
+"""add the covering retry-scan index and the BRIN dedup TTL index
+
+Revision ID: 3e5a9d2c7f41
+Revises: 7c2f4e9a1b3d
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e5a9d2c7f41'
+down_revision = '7c2f4e9a1b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction; if_not_exists skips databases
+    # created from the current models
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_status_updated_incl', 'messages_log', ['status', 'updated_at'],
+            postgresql_include=['source_channel_id', 'source_message_id', 'attempts'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'idx_dedup_created_brin', 'deduplication_cache', ['created_at'],
+            postgresql_using='brin', postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_created_at_ttl', table_name='deduplication_cache',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_created_at_ttl', 'deduplication_cache', ['created_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_dedup_created_brin', table_name='deduplication_cache',
+            postgresql_concurrently=True, if_exists=True,
+        )
+        op.drop_index(
+            'idx_status_updated_incl', table_name='messages_log',
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,37 @@
+"""remove mappings together with either of their channels
+
+Revision ID: 5f8c3b7d1e26
+Revises: 9b1d6e4a2c58
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f8c3b7d1e26'
+down_revision = '9b1d6e4a2c58'
+branch_labels = None
+depends_on = None
+
+# PostgreSQL's default names for the constraints create_all() built
+MAPPING_FOREIGN_KEYS = (
+    ('mappings_source_channel_id_fkey', 'source_channel_id'),
+    ('mappings_dest_channel_id_fkey', 'dest_channel_id'),
+)
+
+
+def _recreate_foreign_keys(ondelete=None) -> None:
+    """Drop and recreate both mapping -> channel foreign keys with the given ON DELETE action."""
+    for name, column in MAPPING_FOREIGN_KEYS:
+        op.drop_constraint(name, 'mappings', type_='foreignkey')
+        op.create_foreign_key(name, 'mappings', 'channels', [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys(ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys()
@@ -0,0 +1,61 @@
+"""store deduplication content hashes as raw digests
+
+Revision ID: 7c2f4e9a1b3d
+Revises: 
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2f4e9a1b3d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_deduplication_cache_content_hash'
+
+
+def _content_hash_is_binary() -> bool:
+    """Check whether the column already holds raw digests, as in databases created from the current models."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('deduplication_cache'):
+        # init_database() will create the table with the current type
+        return True
+    
+    columns = inspector.get_columns('deduplication_cache')
+    content_hash = next(column for column in columns if column['name'] == 'content_hash')
+    return isinstance(content_hash['type'], sa.LargeBinary)
+
+
+def upgrade() -> None:
+    if _content_hash_is_binary():
+        return
+    
+    # Hex strings become 32-byte digests; the unique index is rebuilt on the new type
+    op.drop_index(INDEX_NAME, table_name='deduplication_cache')
+    op.alter_column(
+        'deduplication_cache', 'content_hash',
+        type_=sa.LargeBinary(32),
+        existing_type=sa.String(64),
+        existing_nullable=False,
+        postgresql_using="decode(content_hash, 'hex')",
+    )
+    op.create_index(INDEX_NAME, 'deduplication_cache', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    if not _content_hash_is_binary():
+        return
+    
+    op.drop_index(INDEX_NAME, table_name='deduplication_cache')
+    op.alter_column(
+        'deduplication_cache', 'content_hash',
+        type_=sa.String(64),
+        existing_type=sa.LargeBinary(32),
+        existing_nullable=False,
+        postgresql_using="encode(content_hash, 'hex')",
+    )
+    op.create_index(INDEX_NAME, 'deduplication_cache', ['content_hash'], unique=True)
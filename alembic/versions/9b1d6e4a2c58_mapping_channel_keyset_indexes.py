@@ -0,0 +1,41 @@
+"""add per-side keyset indexes for a channel's mappings
+
+Revision ID: 9b1d6e4a2c58
+Revises: 3e5a9d2c7f41
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1d6e4a2c58'
+down_revision = '3e5a9d2c7f41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps mappings writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_mapping_source_id', 'mappings', ['source_channel_id', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'idx_mapping_dest_id', 'mappings', ['dest_channel_id', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_mapping_dest_id', table_name='mappings',
+            postgresql_concurrently=True, if_exists=True,
+        )
+        op.drop_index(
+            'idx_mapping_source_id', table_name='mappings',
+            postgresql_concurrently=True, if_exists=True,
+        )
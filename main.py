@@ -12,7 +12,7 @@ import sys
 from contextlib import asynccontextmanager
 
 import structlog
-from telegram.ext import Application
+from telegram.ext import AIORateLimiter, Application
 
 from src.config.settings import settings
 from src.clients.client_factory import ClientFactory
@@ -20,6 +20,17 @@ from src.core.forwarding_engine import ForwardingEngine
 from src.handlers.handler_registry import HandlerRegistry
 from src.database.connection import init_database
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """Serialize a log event with orjson, returning str for stdlib handlers."""
+    return orjson.dumps(obj, default=kwargs.get('default')).decode()
+
+
 # Configure structured logging
 structlog.configure(
     processors=[
@@ -31,7 +42,7 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps) if orjson else structlog.processors.JSONRenderer()
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -85,8 +96,15 @@ class BotApplication:
         await self.handler_registry.initialize()
         logger.info("Handler registry initialized")
         
-        # Create Telegram application
-        self.telegram_app = Application.builder().token(settings.bot_token).build()
+        # Create Telegram application; the rate limiter paces API calls to Telegram's
+        # limits and retries once after a RetryAfter instead of failing the handler
+        self.telegram_app = (
+            Application.builder()
+            .token(settings.bot_token)
+            .concurrent_updates(True)
+            .rate_limiter(AIORateLimiter(max_retries=1))
+            .build()
+        )
         
         # Register handlers
         await self.handler_registry.register_handlers(self.telegram_app)
@@ -133,6 +151,10 @@ class BotApplication:
             await self.telegram_app.shutdown()
             logger.info("Telegram bot stopped")
         
+        # Write pending handler state
+        if self.handler_registry:
+            await self.handler_registry.shutdown()
+        
         # Stop forwarding engine
         if self.forwarding_engine:
             await self.forwarding_engine.stop()
@@ -175,6 +197,14 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Use uvloop when available; it must be installed before asyncio.run()
+    # creates the loop. Not supported on Windows.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.management import MigrationCommands, AdminCommands
+from src.database import close_database
 from src.config import settings
 
 
@@ -50,10 +51,14 @@ async def main():
     
     create_user_parser = user_subparsers.add_parser('create-admin', help='Create admin user')
     create_user_parser.add_argument('telegram_id', type=int, help='Telegram user ID')
-    create_user_parser.add_argument('--username', help='Username (optional)')
     
     list_users_parser = user_subparsers.add_parser('list', help='List users')
-    list_users_parser.add_argument('--role', choices=['user', 'administrator'], help='Filter by role')
+    list_users_parser.add_argument('--role', choices=['operator', 'administrator'], help='Filter by role')
+    list_users_parser.add_argument('--limit', type=int, default=100, help='Users per page (default: 100)')
+    list_users_parser.add_argument('--after', help='Cursor printed by the previous page, as CREATED_AT,ID')
+    
+    export_users_parser = user_subparsers.add_parser('export', help='Export all users as JSON lines (id, telegram_id, role, created_at, last_seen)')
+    export_users_parser.add_argument('--role', choices=['operator', 'administrator'], help='Filter by role')
     
     # admin channel
     channel_parser = admin_subparsers.add_parser('channel', help='Channel management')
@@ -113,6 +118,9 @@ async def main():
     except Exception as e:
         print(f"❌ Error: {e}")
         return 1
+    finally:
+        # Commands share one connection pool; release it once the CLI is done
+        await close_database()
     
     return 0
 
@@ -214,7 +222,7 @@ async def handle_admin_commands(args):
     if args.admin_action == 'user':
         if args.user_action == 'create-admin':
             print(f"👤 Creating admin user {args.telegram_id}...")
-            result = await admin_commands.create_admin_user(args.telegram_id, args.username)
+            result = await admin_commands.create_admin_user(args.telegram_id)
             
             if result['success']:
                 print(f"✅ {result['message']}")
@@ -223,17 +231,40 @@ async def handle_admin_commands(args):
         
         elif args.user_action == 'list':
             from src.database.models import UserRole
+            from datetime import datetime
             role_filter = UserRole(args.role) if args.role else None
+            after_created_at = after_id = None
+            if args.after:
+                created_at, _, user_id = args.after.rpartition(',')
+                after_created_at, after_id = datetime.fromisoformat(created_at), int(user_id)
             
             print("👥 Listing users...")
-            result = await admin_commands.list_users(role_filter)
+            result = await admin_commands.list_users(
+                role_filter,
+                after_created_at=after_created_at,
+                after_id=after_id,
+                limit=args.limit
+            )
             
             if result['success']:
-                print(f"Found {result['total_count']} users:")
+                approx = "~" if result['total_is_estimate'] else ""
+                print(f"Showing {len(result['users'])} of {approx}{result['total_count']} users:")
                 for user in result['users']:
-                    print(f"   - {user['telegram_id']} ({user['role']}) - {user.get('username', 'No username')}")
+                    print(f"   - {user['telegram_id']} ({user['role']}) - last seen {user['last_seen'] or 'never'}")
+                if result['next_cursor']:
+                    created_at, user_id = result['next_cursor']
+                    print(f"   Next page: --after {created_at},{user_id}")
             else:
                 print(f"❌ {result.get('error', 'Unknown error')}")
+        
+        elif args.user_action == 'export':
+            import json
+            from src.database.models import UserRole
+            role_filter = UserRole(args.role) if args.role else None
+            
+            # Streamed, so large user tables are never held in memory
+            async for user in admin_commands.iter_users(role_filter):
+                print(json.dumps(user))
     
     elif args.admin_action == 'channel':
         if args.channel_action == 'add':
@@ -5,7 +5,7 @@ Handles all bot interactions and preserves existing handler functionality.
 import logging
 from typing import Optional, Dict, Any, List
 from telegram import Bot, Update
-from telegram.ext import Application, ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters
+from telegram.ext import AIORateLimiter, Application, ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters
 from telegram.error import TelegramError, RetryAfter, TimedOut
 
 from src.config import settings
@@ -26,8 +26,15 @@ class BotClientManager:
         """Initialize the bot application and register handlers."""
         logger.info("Initializing Bot API client...")
         
-        # Create application
-        self.application = Application.builder().token(settings.bot_token).build()
+        # Create application; handlers are independent, so process updates concurrently,
+        # and outgoing calls are paced to Telegram's limits with one retry after RetryAfter
+        self.application = (
+            Application.builder()
+            .token(settings.bot_token)
+            .concurrent_updates(True)
+            .rate_limiter(AIORateLimiter(max_retries=1))
+            .build()
+        )
         self.bot = self.application.bot
         
         # Register handlers
@@ -40,16 +47,16 @@ class BotClientManager:
         app = self.application
         
         # Command handlers
-        app.add_handler(CommandHandler("start", self._start_command))
-        app.add_handler(CommandHandler("help", self._help_command))
-        app.add_handler(CommandHandler("admin", self._admin_command))
-        app.add_handler(CommandHandler("status", self._status_command))
+        app.add_handler(CommandHandler("start", self._start_command, block=False))
+        app.add_handler(CommandHandler("help", self._help_command, block=False))
+        app.add_handler(CommandHandler("admin", self._admin_command, block=False))
+        app.add_handler(CommandHandler("status", self._status_command, block=False))
         
         # Callback query handlers
-        app.add_handler(CallbackQueryHandler(self._callback_query_handler))
+        app.add_handler(CallbackQueryHandler(self._callback_query_handler, block=False))
         
         # Message handlers for user input states
-        app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._message_handler))
+        app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._message_handler, block=False))
         
         # Error handler
         app.add_error_handler(self._error_handler)
@@ -25,6 +25,10 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str = Field(..., description="PostgreSQL database URL")
+    database_behind_pgbouncer: bool = Field(
+        default=False,
+        description="Connect through PgBouncer (transaction mode) instead of a client-side pool"
+    )
     
     # Redis Configuration
     redis_url: str = Field(
@@ -38,6 +42,7 @@ class Settings(BaseSettings):
     
     # Performance Configuration
     max_concurrent_forwards: int = Field(default=10, ge=1, le=100)
+    max_concurrent_db: int = Field(default=10, ge=1, le=100, description="Concurrent DB operations from bot handlers")
     max_retry_attempts: int = Field(default=3, ge=1, le=10)
     flood_wait_multiplier: float = Field(default=1.5, ge=1.0, le=5.0)
     
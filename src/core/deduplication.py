@@ -33,7 +33,7 @@ class DeduplicationService:
                 # Check if hash exists in cache
                 result = await session.execute(
                     select(DeduplicationCache).where(
-                        DeduplicationCache.content_hash == content_hash
+                        DeduplicationCache.content_hash == self._hash_key(content_hash)
                     )
                 )
                 existing = result.scalar_one_or_none()
@@ -68,7 +68,7 @@ class DeduplicationService:
             async with get_db_session() as session:
                 # Use PostgreSQL UPSERT to handle race conditions
                 stmt = insert(DeduplicationCache).values(
-                    content_hash=content_hash,
+                    content_hash=self._hash_key(content_hash),
                     source_channel_id=source_channel_id,
                     source_message_id=source_message_id,
                     created_at=datetime.utcnow()
@@ -146,6 +146,11 @@ class DeduplicationService:
                 'cache_ttl_hours': self.cache_ttl_hours
             }
     
+    @staticmethod
+    def _hash_key(content_hash: str) -> bytes:
+        """Convert a hex content hash from message data into the stored raw digest."""
+        return bytes.fromhex(content_hash)
+    
     def _is_cache_valid(self, created_at: datetime) -> bool:
         """Check if a cache entry is still valid based on TTL."""
         expiry_time = created_at + timedelta(hours=self.cache_ttl_hours)
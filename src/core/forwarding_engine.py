@@ -240,8 +240,8 @@ class ForwardingEngine:
             )
             
             session.add(message_log)
+            # The INSERT populates the id; callers only need that, so skip the refresh SELECT
             await session.commit()
-            await session.refresh(message_log)
             return message_log
     
     async def _update_message_log_status(self, message_log_id: int, status: MessageStatus) -> None:
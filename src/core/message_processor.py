@@ -141,7 +141,8 @@ class MessageProcessor:
         if text:
             # Basic text analysis
             analysis['word_count'] = len(text.split())
-            analysis['has_urls'] = 'http' in text.lower() or 'www.' in text.lower()
+            lowered = text.lower()
+            analysis['has_urls'] = 'http' in lowered or 'www.' in lowered
             analysis['has_mentions'] = '@' in text
             analysis['has_hashtags'] = '#' in text
             
@@ -5,16 +5,52 @@ Implements priority queuing, retry logic, and FloodWait handling.
 import asyncio
 import json
 import logging
+import time
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
 
 import aioredis
 from aioredis import Redis
+from aioredis.exceptions import NoScriptError
 
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Queue key names
+MAIN_QUEUE = "forwarding:messages"
+PRIORITY_QUEUE = f"{MAIN_QUEUE}:priority"
+RETRY_QUEUE = "forwarding:retry"
+FAILED_QUEUE = "forwarding:failed"
+FLOOD_WAIT_QUEUE = "forwarding:flood_wait"
+
+# Shared encoder/decoder so the hot path doesn't rebuild them per call
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+_DECODER = json.JSONDecoder()
+_dumps = _ENCODER.encode
+_loads = _DECODER.decode
+
+# Pop the highest-priority message, falling back to the tail of the main queue
+LUA_POP = """
+local top = redis.call('ZPOPMAX', KEYS[1])
+if top[1] then
+    return top[1]
+end
+return redis.call('RPOP', KEYS[2])
+"""
+
+# Atomically move up to ARGV[2] messages scored <= ARGV[1] onto the main queue
+LUA_DRAIN = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], 0, ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+    redis.call('LPUSH', KEYS[2], unpack(due))
+end
+return #due
+"""
+
+# Maximum messages moved per drain script call
+DRAIN_BATCH_SIZE = 500
+
 
 class QueueManager:
     """Manages Redis-based message queuing with retry and FloodWait support."""
@@ -24,14 +60,18 @@ class QueueManager:
         self._running = False
         
         # Queue names
-        self.main_queue = "forwarding:messages"
-        self.retry_queue = "forwarding:retry"
-        self.failed_queue = "forwarding:failed"
-        self.flood_wait_queue = "forwarding:flood_wait"
+        self.main_queue = MAIN_QUEUE
+        self.priority_queue = PRIORITY_QUEUE
+        self.retry_queue = RETRY_QUEUE
+        self.failed_queue = FAILED_QUEUE
+        self.flood_wait_queue = FLOOD_WAIT_QUEUE
         
         # Queue processing task
         self._retry_processor_task = None
         self._flood_wait_processor_task = None
+        
+        # Lua script SHAs, keyed by script source
+        self._script_shas: Dict[str, str] = {}
     
     async def start(self) -> None:
         """Start the queue manager and connect to Redis."""
@@ -51,6 +91,9 @@ class QueueManager:
         # Test connection
         await self.redis.ping()
         
+        # Register scripts once so calls only send the SHA
+        await self._load_scripts()
+        
         self._running = True
         
         # Start background processors
@@ -85,7 +128,25 @@ class QueueManager:
             await self.redis.close()
         
         logger.info("Queue manager stopped")
-    
+
+    async def _load_scripts(self) -> None:
+        """Load Lua scripts into the Redis script cache."""
+        for source in (LUA_POP, LUA_DRAIN):
+            self._script_shas[source] = await self.redis.script_load(source)
+
+    async def _run_script(self, source: str, *keys: str, args: tuple = ()) -> Any:
+        """Run a cached Lua script by SHA, reloading it once if Redis lost it."""
+        sha = self._script_shas.get(source)
+        if sha is None:
+            sha = self._script_shas[source] = await self.redis.script_load(source)
+
+        try:
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            # Script cache was flushed (restart/failover); load it again
+            sha = self._script_shas[source] = await self.redis.script_load(source)
+            return await self.redis.evalsha(sha, len(keys), *keys, *args)
+
     async def enqueue_message(self, message_data: Dict[str, Any], priority: int = 0) -> None:
         """Add a message to the main processing queue."""
         if not self.redis:
@@ -93,16 +154,16 @@ class QueueManager:
         
         try:
             # Add metadata
-            message_data['enqueued_at'] = datetime.utcnow().isoformat()
+            message_data['enqueued_at'] = int(time.time())
             message_data['priority'] = priority
             message_data['attempts'] = 0
             
             # Serialize and enqueue
-            message_json = json.dumps(message_data)
+            message_json = _dumps(message_data)
             
             if priority > 0:
                 # Use sorted set for priority queue
-                await self.redis.zadd(f"{self.main_queue}:priority", {message_json: priority})
+                await self.redis.zadd(self.priority_queue, {message_json: priority})
             else:
                 # Use regular list for normal priority
                 await self.redis.lpush(self.main_queue, message_json)
@@ -119,17 +180,16 @@ class QueueManager:
             return None
         
         try:
-            # First check priority queue
-            priority_result = await self.redis.zpopmax(f"{self.main_queue}:priority")
-            if priority_result:
-                message_json = priority_result[0][0]
-                return json.loads(message_json)
+            # Priority queue first, then main queue, in a single round trip
+            message_json = await self._run_script(LUA_POP, self.priority_queue, self.main_queue)
+            if message_json:
+                return _loads(message_json)
             
-            # Then check regular queue
+            # Block on the regular queue until something arrives
             result = await self.redis.brpop(self.main_queue, timeout=timeout)
             if result:
                 message_json = result[1]
-                return json.loads(message_json)
+                return _loads(message_json)
             
             return None
             
@@ -145,11 +205,11 @@ class QueueManager:
         try:
             # Update retry metadata
             message_data['attempts'] = message_data.get('attempts', 0) + 1
-            message_data['retry_after'] = (datetime.utcnow() + timedelta(seconds=delay_seconds)).isoformat()
+            retry_time = time.time() + delay_seconds
+            message_data['retry_after'] = int(retry_time)
             
             # Add to retry queue with score as timestamp
-            retry_time = datetime.utcnow().timestamp() + delay_seconds
-            message_json = json.dumps(message_data)
+            message_json = _dumps(message_data)
             
             await self.redis.zadd(self.retry_queue, {message_json: retry_time})
             
@@ -166,12 +226,12 @@ class QueueManager:
         
         try:
             # Update FloodWait metadata
-            message_data['flood_wait_until'] = (datetime.utcnow() + timedelta(seconds=wait_seconds)).isoformat()
+            wait_until = time.time() + wait_seconds
+            message_data['flood_wait_until'] = int(wait_until)
             message_data['flood_wait_duration'] = wait_seconds
             
             # Add to FloodWait queue
-            wait_until = datetime.utcnow().timestamp() + wait_seconds
-            message_json = json.dumps(message_data)
+            message_json = _dumps(message_data)
             
             await self.redis.zadd(self.flood_wait_queue, {message_json: wait_until})
             
@@ -188,11 +248,11 @@ class QueueManager:
         
         try:
             # Update failure metadata
-            message_data['failed_at'] = datetime.utcnow().isoformat()
+            message_data['failed_at'] = int(time.time())
             message_data['final_error'] = error_message
             message_data['final_attempts'] = message_data.get('attempts', 0)
             
-            message_json = json.dumps(message_data)
+            message_json = _dumps(message_data)
             await self.redis.lpush(self.failed_queue, message_json)
             
             logger.warning(f"Message permanently failed after {message_data.get('attempts', 0)} attempts: {error_message}")
@@ -207,22 +267,12 @@ class QueueManager:
         
         while self._running:
             try:
-                current_time = datetime.utcnow().timestamp()
+                current_time = time.time()
                 
-                # Get messages ready for retry
-                results = await self.redis.zrangebyscore(
-                    self.retry_queue, 0, current_time, withscores=True
-                )
-                
-                for message_json, score in results:
-                    # Remove from retry queue
-                    await self.redis.zrem(self.retry_queue, message_json)
-                    
-                    # Re-enqueue for processing
-                    message_data = json.loads(message_json)
-                    await self.enqueue_message(message_data)
-                    
-                    logger.debug("Moved message from retry queue back to main queue")
+                # Move messages ready for retry back to the main queue
+                moved = await self._requeue_due(self.retry_queue, current_time)
+                if moved:
+                    logger.debug(f"Moved {moved} messages from retry queue back to main queue")
                 
                 # Sleep before next check
                 await asyncio.sleep(10)
@@ -241,22 +291,12 @@ class QueueManager:
         
         while self._running:
             try:
-                current_time = datetime.utcnow().timestamp()
-                
-                # Get messages ready after FloodWait
-                results = await self.redis.zrangebyscore(
-                    self.flood_wait_queue, 0, current_time, withscores=True
-                )
+                current_time = time.time()
                 
-                for message_json, score in results:
-                    # Remove from FloodWait queue
-                    await self.redis.zrem(self.flood_wait_queue, message_json)
-                    
-                    # Re-enqueue for processing
-                    message_data = json.loads(message_json)
-                    await self.enqueue_message(message_data)
-                    
-                    logger.info("Moved message from FloodWait queue back to main queue")
+                # Move messages ready after FloodWait back to the main queue
+                moved = await self._requeue_due(self.flood_wait_queue, current_time)
+                if moved:
+                    logger.info(f"Moved {moved} messages from FloodWait queue back to main queue")
                 
                 # Sleep before next check
                 await asyncio.sleep(15)
@@ -269,6 +309,22 @@ class QueueManager:
         
         logger.info("FloodWait queue processor stopped")
     
+    async def _requeue_due(self, source_queue: str, current_time: float) -> int:
+        """Move due messages from a delay queue back to the main queue.
+        
+        Each batch is selected, removed and pushed inside one Lua script, so
+        two processors can never requeue the same message twice.
+        """
+        total = 0
+        while True:
+            moved = await self._run_script(
+                LUA_DRAIN, source_queue, self.main_queue,
+                args=(current_time, DRAIN_BATCH_SIZE)
+            )
+            total += moved
+            if moved < DRAIN_BATCH_SIZE:
+                return total
+    
     async def get_queue_size(self) -> Dict[str, int]:
         """Get the size of all queues."""
         if not self.redis:
@@ -277,7 +333,7 @@ class QueueManager:
         try:
             sizes = {}
             sizes['main'] = await self.redis.llen(self.main_queue)
-            sizes['priority'] = await self.redis.zcard(f"{self.main_queue}:priority")
+            sizes['priority'] = await self.redis.zcard(self.priority_queue)
             sizes['retry'] = await self.redis.zcard(self.retry_queue)
             sizes['flood_wait'] = await self.redis.zcard(self.flood_wait_queue)
             sizes['failed'] = await self.redis.llen(self.failed_queue)
@@ -310,7 +366,7 @@ class QueueManager:
         try:
             if queue_name == 'main':
                 deleted = await self.redis.delete(self.main_queue)
-                deleted += await self.redis.delete(f"{self.main_queue}:priority")
+                deleted += await self.redis.delete(self.priority_queue)
             elif queue_name == 'retry':
                 deleted = await self.redis.delete(self.retry_queue)
             elif queue_name == 'flood_wait':
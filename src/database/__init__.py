@@ -5,7 +5,7 @@ from .models import (
     DeduplicationCache, FloodWaitLog, LegacyFolder, LegacyList,
     AccessType, ForwardingMode, MessageStatus, UserRole
 )
-from .connection import DatabaseManager, get_db_session
+from .connection import DatabaseManager, db_manager, get_db_session, init_database, close_database
 
 __all__ = [
     "Base",
@@ -22,5 +22,8 @@ __all__ = [
     "MessageStatus",
     "UserRole",
     "DatabaseManager",
-    "get_db_session"
+    "db_manager",
+    "get_db_session",
+    "init_database",
+    "close_database"
 ]
@@ -14,7 +14,7 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import NullPool
 
-from src.config import get_database_url
+from src.config import settings, get_database_url
 from .models import Base
 
 logger = logging.getLogger(__name__)
@@ -36,14 +36,27 @@ class DatabaseManager:
         if self._engine is None:
             # Convert postgresql:// to postgresql+asyncpg://
             async_url = self.database_url.replace("postgresql://", "postgresql+asyncpg://")
-            self._engine = create_async_engine(
-                async_url,
-                echo=False,
-                pool_pre_ping=True,
-                pool_recycle=3600,
-                max_overflow=20,
-                pool_size=10
-            )
+            if settings.database_behind_pgbouncer:
+                # PgBouncer owns the pool; prepared statements can't survive
+                # transaction-mode connection switching, so disable their caches
+                self._engine = create_async_engine(
+                    async_url,
+                    echo=False,
+                    poolclass=NullPool,
+                    connect_args={
+                        "statement_cache_size": 0,
+                        "prepared_statement_cache_size": 0
+                    }
+                )
+            else:
+                self._engine = create_async_engine(
+                    async_url,
+                    echo=False,
+                    pool_pre_ping=True,
+                    pool_recycle=3600,
+                    max_overflow=20,
+                    pool_size=10
+                )
         return self._engine
     
     @property
@@ -113,7 +126,8 @@ class DatabaseManager:
     async def check_connection(self) -> bool:
         """Check if database connection is working."""
         try:
-            async with self.engine.begin() as conn:
+            # Plain connect() avoids the BEGIN/COMMIT pair of engine.begin()
+            async with self.engine.connect() as conn:
                 await conn.execute(text("SELECT 1"))
             return True
         except Exception as e:
@@ -131,15 +145,23 @@ class DatabaseManager:
 # Global database manager instance
 db_manager = DatabaseManager()
 
+# Set once tables are verified; callers may invoke init_database() per command
+_database_initialized = False
 
+
+@asynccontextmanager
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency function to get database session."""
+    """Get a database session from the shared pool; use with ``async with``."""
     async with db_manager.get_session() as session:
         yield session
 
 
 async def init_database():
-    """Initialize database with tables and basic data."""
+    """Initialize database with tables and basic data; later calls are no-ops."""
+    global _database_initialized
+    if _database_initialized:
+        return
+    
     logger.info("Initializing database...")
     
     # Check connection
@@ -149,10 +171,13 @@ async def init_database():
     # Create tables
     await db_manager.create_tables()
     
+    _database_initialized = True
     logger.info("Database initialization completed")
 
 
 async def close_database():
     """Close database connections."""
+    global _database_initialized
+    _database_initialized = False
     await db_manager.close()
     logger.info("Database connections closed")
@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlalchemy import (
     BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, 
-    JSON, String, Text, UniqueConstraint, Index
+    JSON, LargeBinary, String, Text, UniqueConstraint, Index
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -80,12 +80,14 @@ class Channel(Base):
     source_mappings: Mapped[List["ForwardingMapping"]] = relationship(
         "ForwardingMapping", 
         foreign_keys="ForwardingMapping.source_channel_id",
-        back_populates="source_channel"
+        back_populates="source_channel",
+        passive_deletes=True
     )
     dest_mappings: Mapped[List["ForwardingMapping"]] = relationship(
         "ForwardingMapping",
         foreign_keys="ForwardingMapping.dest_channel_id", 
-        back_populates="dest_channel"
+        back_populates="dest_channel",
+        passive_deletes=True
     )
     source_messages: Mapped[List["MessageLog"]] = relationship("MessageLog", back_populates="source_channel")
 
@@ -95,8 +97,9 @@ class ForwardingMapping(Base):
     __tablename__ = "mappings"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    source_channel_id: Mapped[int] = mapped_column(Integer, ForeignKey("channels.id"), nullable=False)
-    dest_channel_id: Mapped[int] = mapped_column(Integer, ForeignKey("channels.id"), nullable=False)
+    # Mappings go with either of their channels; the database removes them
+    source_channel_id: Mapped[int] = mapped_column(Integer, ForeignKey("channels.id", ondelete="CASCADE"), nullable=False)
+    dest_channel_id: Mapped[int] = mapped_column(Integer, ForeignKey("channels.id", ondelete="CASCADE"), nullable=False)
     mode: Mapped[ForwardingMode] = mapped_column(Enum(ForwardingMode), nullable=False, default=ForwardingMode.FORWARD)
     enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -114,10 +117,23 @@ class ForwardingMapping(Base):
         back_populates="dest_mappings"
     )
     
+    @property
+    def source_title(self) -> Optional[str]:
+        """Source channel title, matching the projected list rows."""
+        return self.source_channel.title if self.source_channel else None
+    
+    @property
+    def dest_title(self) -> Optional[str]:
+        """Destination channel title, matching the projected list rows."""
+        return self.dest_channel.title if self.dest_channel else None
+    
     # Constraints
     __table_args__ = (
         UniqueConstraint('source_channel_id', 'dest_channel_id', name='unique_mapping'),
         Index('idx_source_enabled', 'source_channel_id', 'enabled'),
+        # Keyset pages of a channel's mappings, one index per side
+        Index('idx_mapping_source_id', 'source_channel_id', 'id'),
+        Index('idx_mapping_dest_id', 'dest_channel_id', 'id'),
     )
 
 
@@ -146,6 +162,11 @@ class MessageLog(Base):
         UniqueConstraint('source_channel_id', 'source_message_id', name='unique_source_message'),
         Index('idx_status_attempts', 'status', 'attempts'),
         Index('idx_created_at', 'created_at'),
+        # Covering index so retry scans by status/updated_at stay index-only
+        Index(
+            'idx_status_updated_incl', 'status', 'updated_at',
+            postgresql_include=['source_channel_id', 'source_message_id', 'attempts']
+        ),
     )
 
 
@@ -154,14 +175,14 @@ class DeduplicationCache(Base):
     __tablename__ = "deduplication_cache"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    content_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
+    content_hash: Mapped[bytes] = mapped_column(LargeBinary(32), unique=True, nullable=False, index=True)  # Raw SHA-256 digest
     source_channel_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     source_message_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
-    # TTL index for automatic cleanup (PostgreSQL specific)
+    # BRIN index for TTL sweeps on this append-only table (PostgreSQL specific)
     __table_args__ = (
-        Index('idx_created_at_ttl', 'created_at'),
+        Index('idx_dedup_created_brin', 'created_at', postgresql_using='brin'),
     )
 
 
@@ -2,10 +2,16 @@
 Handler registry for managing bot command and callback handlers.
 Integrates existing functionality with the new dual-client architecture.
 """
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import time
+import weakref
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Set, Tuple
 
 from telegram import Update
+from telegram.error import BadRequest, RetryAfter, TimedOut, TelegramError
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler, MessageHandler, filters
 
 from src.clients import ClientFactory
@@ -14,17 +20,175 @@ from ..config.settings import settings, is_admin
 from .legacy_migrator import LegacyHandlerMigrator
 from ..ui import MenuFormatter, state_manager, CallbackAction, parse_callback_data
 from ..ui.state_manager import UserState
-from ..ui.keyboards import ChannelKeyboards, MappingKeyboards
+from ..ui.keyboards import ChannelKeyboards, MappingKeyboards, PaginationInfo
 from src.database import get_db_session, User, Channel, ForwardingMapping, UserRole
 from src.management import AdminCommands
-from sqlalchemy import select, func
+from sqlalchemy import select, update, case, func, true, union_all, bindparam, lambda_stmt
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import aliased, selectinload
 
 logger = logging.getLogger(__name__)
 
+# Rows shown per list page
+PAGE_SIZE = 10
+
+# /help texts, built once
+_HELP_USER = """📚 **Bot Commands Help**
+
+**General Commands:**
+• `/start` - Main menu and introduction
+• `/help` - Show this help message
+• `/menu` - Show main navigation menu
+• `/status` - View system status
+• `/setup` - Run setup wizard
+
+**Navigation:**
+• Use inline buttons for navigation
+• 📺 Channels - Manage source/destination channels
+• 🔗 Mappings - Configure forwarding rules
+• ⚙️ Settings - User preferences
+
+💡 **Tip:** Use the interactive menus for the best experience!"""
+
+_HELP_ADMIN = _HELP_USER + """
+
+**Admin Commands:**
+• `/admin` - Administrator panel
+• System management tools"""
+
+# Mapping views always render both channel titles; load them up front
+_MAPPING_CHANNELS = (
+    selectinload(ForwardingMapping.source_channel),
+    selectinload(ForwardingMapping.dest_channel),
+)
+
+# List views only read a few columns, so they fetch plain rows instead of ORM objects
+_SourceChannel = aliased(Channel)
+_DestChannel = aliased(Channel)
+_CHANNEL_ROW = (Channel.id, Channel.title, Channel.is_active, Channel.access_type)
+_MAPPING_ROW = (
+    ForwardingMapping.id,
+    ForwardingMapping.enabled,
+    ForwardingMapping.mode,
+    _SourceChannel.title.label('source_title'),
+    _DestChannel.title.label('dest_title'),
+)
+
+# Minimal channel reference used as the mappings list filter
+ChannelRef = namedtuple('ChannelRef', ['id', 'title'])
+
+# Hot list statements, built once; only the bound parameters change per call
+_CHANNELS_PAGE_STMT = lambda_stmt(
+    lambda: select(*_CHANNEL_ROW)
+    .where(Channel.id > bindparam('after_id'))
+    .order_by(Channel.id)
+    .limit(PAGE_SIZE + 1),
+    enable_tracking=False
+)
+_MAPPINGS_PAGE_STMT = lambda_stmt(
+    lambda: select(*_MAPPING_ROW)
+    .join(_SourceChannel, _SourceChannel.id == ForwardingMapping.source_channel_id)
+    .join(_DestChannel, _DestChannel.id == ForwardingMapping.dest_channel_id)
+    .where(ForwardingMapping.id > bindparam('after_id'))
+    .order_by(ForwardingMapping.id)
+    .limit(PAGE_SIZE + 1),
+    enable_tracking=False
+)
+# Mapping ids touching the filter channel. Each branch walks its own
+# (channel, id) index instead of OR-ing both columns into a scan; the second
+# branch skips self-mappings already returned by the first.
+_FILTERED_MAPPING_IDS = union_all(
+    select(ForwardingMapping.id)
+    .where(
+        ForwardingMapping.source_channel_id == bindparam('channel_id'),
+        ForwardingMapping.id > bindparam('after_id')
+    )
+    .order_by(ForwardingMapping.id)
+    .limit(PAGE_SIZE + 1),
+    select(ForwardingMapping.id)
+    .where(
+        ForwardingMapping.dest_channel_id == bindparam('channel_id'),
+        ForwardingMapping.source_channel_id != bindparam('channel_id'),
+        ForwardingMapping.id > bindparam('after_id')
+    )
+    .order_by(ForwardingMapping.id)
+    .limit(PAGE_SIZE + 1),
+).subquery()
+# Filter channel plus its page of mappings; the outer joins keep the channel
+# row when it has no mappings
+_FILTERED_MAPPINGS_PAGE_STMT = lambda_stmt(
+    lambda: select(Channel.id.label('channel_id'), Channel.title.label('channel_title'), *_MAPPING_ROW)
+    .select_from(Channel)
+    .outerjoin(_FILTERED_MAPPING_IDS, true())
+    .outerjoin(ForwardingMapping, ForwardingMapping.id == _FILTERED_MAPPING_IDS.c.id)
+    .outerjoin(_SourceChannel, _SourceChannel.id == ForwardingMapping.source_channel_id)
+    .outerjoin(_DestChannel, _DestChannel.id == ForwardingMapping.dest_channel_id)
+    .where(Channel.id == bindparam('channel_id'))
+    .order_by(ForwardingMapping.id)
+    .limit(PAGE_SIZE + 1),
+    enable_tracking=False
+)
+_CHANNELS_COUNT_STMT = lambda_stmt(lambda: select(func.count(Channel.id)), enable_tracking=False)
+_MAPPINGS_COUNT_STMT = lambda_stmt(lambda: select(func.count(ForwardingMapping.id)), enable_tracking=False)
+_FILTERED_MAPPINGS_COUNT_STMT = lambda_stmt(
+    lambda: select(
+        select(func.count(ForwardingMapping.id))
+        .where(ForwardingMapping.source_channel_id == bindparam('channel_id'))
+        .scalar_subquery()
+        + select(func.count(ForwardingMapping.id))
+        .where(
+            ForwardingMapping.dest_channel_id == bindparam('channel_id'),
+            ForwardingMapping.source_channel_id != bindparam('channel_id')
+        )
+        .scalar_subquery()
+    ),
+    enable_tracking=False
+)
+
 
 class HandlerRegistry:
     """Registry for managing all bot handlers and integrating legacy functionality."""
     
+    # Seconds a cached user row is served before re-reading the database
+    _USER_TTL = 60.0
+    
+    # Seconds a list total is reused for the "Page X of Y" header
+    _COUNT_TTL = 30.0
+    
+    # Seconds between batched last-seen writes
+    _SEEN_FLUSH_INTERVAL = 5.0
+    
+    # Seconds an idle per-chat worker waits before exiting
+    _CHAT_WORKER_IDLE = 60.0
+    
+    # Seconds shutdown waits for queued updates before cancelling the workers
+    _CHAT_DRAIN_TIMEOUT = 10.0
+    
+    # Seconds an admin check result is reused
+    _ADMIN_TTL = 30.0
+    
+    # Bot command -> handler method name
+    _COMMANDS = (
+        ("start", "handle_start"),
+        ("help", "handle_help"),
+        ("menu", "handle_main_menu"),
+        ("status", "handle_status"),
+        ("admin", "handle_admin_panel"),
+        ("setup", "handle_setup"),
+    )
+    
+    # Callback action value -> handler method name
+    _CALLBACK_DISPATCH = {
+        CallbackAction.MAIN_MENU.value: '_handle_main_menu_callback',
+        CallbackAction.CHANNELS_LIST.value: '_handle_channels_list_callback',
+        CallbackAction.CHANNEL_VIEW.value: '_handle_channel_view_callback',
+        CallbackAction.MAPPINGS_LIST.value: '_handle_mappings_list_callback',
+        CallbackAction.MAPPING_VIEW.value: '_handle_mapping_view_callback',
+        CallbackAction.ADMIN_PANEL.value: '_handle_admin_panel_callback',
+        CallbackAction.SYSTEM_STATUS.value: '_handle_system_status_callback',
+        CallbackAction.SETTINGS.value: '_handle_settings_callback',
+    }
+    
     def __init__(self, client_factory: ClientFactory, forwarding_engine: ForwardingEngine):
         """Initialize the handler registry with required dependencies."""
         self.client_factory = client_factory
@@ -33,6 +197,36 @@ class HandlerRegistry:
         self.legacy_migrator = LegacyHandlerMigrator(client_factory, forwarding_engine)
         self.logger = logger.bind(component="handler_registry")
         self._initialized = False
+        
+        # User rows keyed by telegram_id, with per-user locks against dogpiling
+        self._user_cache: Dict[int, Tuple[float, User]] = {}
+        self._user_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+        
+        # List totals keyed by (list name, filter)
+        self._count_cache: Dict[Tuple[str, Optional[int]], Tuple[float, int]] = {}
+        
+        # Caps concurrent handler DB work so a slow query can't starve the pool
+        self._db_pool = asyncio.Semaphore(settings.max_concurrent_db)
+        
+        # Last-seen timestamps waiting for the next batched write
+        self._pending_seen: Dict[int, datetime] = {}
+        self._seen_flush_task: Optional[asyncio.Task] = None
+        
+        # Pending updates per chat, each drained in order by its own worker task
+        self._chat_workers: Dict[int, asyncio.Queue] = {}
+        self._chat_tasks: Set[asyncio.Task] = set()
+        
+        # Admin check results keyed by telegram_id
+        self._admin_cache: Dict[int, Tuple[bool, float]] = {}
+        
+        # Replies postponed by a flood wait; held so the tasks aren't collected early
+        self._delayed_replies: Set[asyncio.Task] = set()
+        
+        # Callback action value -> bound handler, resolved once
+        self._cb_handlers = {
+            action: getattr(self, handler_name)
+            for action, handler_name in self._CALLBACK_DISPATCH.items()
+        }
     
     async def initialize(self) -> None:
         """Initialize the handler registry."""
@@ -42,11 +236,35 @@ class HandlerRegistry:
         logger.info("Initializing handler registry...")
         
         # Initialize legacy handler migrator
-        await self.legacy_migrator.initialize()
+        self.legacy_migrator.initialize()
+        
+        # Background writer for user activity
+        self._seen_flush_task = asyncio.create_task(self._flush_seen_loop())
         
         self._initialized = True
         logger.info("Handler registry initialized")
     
+    async def shutdown(self) -> None:
+        """Stop background tasks and write any pending user activity."""
+        # Let queued updates finish, then stop the workers waiting for more
+        if self._chat_workers:
+            drains = [asyncio.create_task(queue.join()) for queue in self._chat_workers.values()]
+            _, pending = await asyncio.wait(drains, timeout=self._CHAT_DRAIN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+        
+        for task in self._chat_tasks:
+            task.cancel()
+        await asyncio.gather(*self._chat_tasks, return_exceptions=True)
+        self._chat_workers.clear()
+        
+        if self._seen_flush_task:
+            self._seen_flush_task.cancel()
+            await asyncio.gather(self._seen_flush_task, return_exceptions=True)
+            self._seen_flush_task = None
+        
+        await self._flush_seen_users()
+    
     async def register_handlers(self) -> None:
         """Register all handlers with the bot client."""
         if not self._initialized:
@@ -58,28 +276,61 @@ class HandlerRegistry:
         
         logger.info("Registering handlers with bot client...")
         
-        # Register command handlers
-        bot_app.add_handler(CommandHandler("start", self.handle_start))
-        bot_app.add_handler(CommandHandler("help", self.handle_help))
-        bot_app.add_handler(CommandHandler("menu", self.handle_main_menu))
-        bot_app.add_handler(CommandHandler("status", self.handle_status))
-        bot_app.add_handler(CommandHandler("admin", self.handle_admin_panel))
-        bot_app.add_handler(CommandHandler("setup", self.handle_setup))
+        # Handlers don't block the dispatcher; _per_chat keeps each chat's updates in order
+        for command, handler_name in self._COMMANDS:
+            bot_app.add_handler(CommandHandler(command, self._per_chat(getattr(self, handler_name)), block=False))
         
         # Register callback query handler
-        bot_app.add_handler(CallbackQueryHandler(self.handle_callback_query))
+        bot_app.add_handler(CallbackQueryHandler(self._per_chat(self.handle_callback_query), block=False))
         
         # Register message handler for state-based input
         bot_app.add_handler(MessageHandler(
             filters.TEXT & ~filters.COMMAND, 
-            self.handle_text_input
+            self._per_chat(self.handle_text_input),
+            block=False
         ))
         
-        # Register legacy handlers through migrator
-        await self.legacy_migrator.register_handlers(bot_app)
+        # Legacy callbacks and messages reach the migrator through the handlers above
         
         logger.info("All handlers registered successfully")
     
+    def _per_chat(self, handler):
+        """Wrap a handler so updates from one chat run in order, while chats run in parallel."""
+        async def enqueue(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+            chat = update.effective_chat
+            if chat is None:
+                await handler(update, context)
+                return
+            
+            queue = self._chat_workers.get(chat.id)
+            if queue is None:
+                queue = self._chat_workers[chat.id] = asyncio.Queue()
+                task = asyncio.create_task(self._chat_worker(chat.id, queue))
+                self._chat_tasks.add(task)
+                task.add_done_callback(self._chat_tasks.discard)
+            queue.put_nowait((handler, update, context))
+        
+        return enqueue
+    
+    async def _chat_worker(self, chat_id: int, queue: asyncio.Queue) -> None:
+        """Run one chat's queued updates sequentially, exiting once idle."""
+        while True:
+            try:
+                handler, update, context = await asyncio.wait_for(queue.get(), self._CHAT_WORKER_IDLE)
+            except asyncio.TimeoutError:
+                # Nothing can be enqueued between this check and the pop
+                if queue.empty():
+                    self._chat_workers.pop(chat_id, None)
+                    return
+                continue
+            
+            try:
+                await handler(update, context)
+            except Exception as e:
+                logger.error(f"Error handling update for chat {chat_id}: {e}", exc_info=True)
+            finally:
+                queue.task_done()
+    
     # Command handlers with new UI integration
     async def handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command with user registration and main menu."""
@@ -88,7 +339,7 @@ class HandlerRegistry:
             return
         
         # Register or update user in database
-        db_user = await self._register_user(user)
+        db_user = await self._run_db(self._register_user, user)
         
         # Clear any existing state
         state_manager.clear_user_state(user.id)
@@ -99,33 +350,19 @@ class HandlerRegistry:
     
     async def handle_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /help command."""
-        help_text = """
-📚 **Bot Commands Help**
-
-**General Commands:**
-• `/start` - Main menu and introduction
-• `/help` - Show this help message
-• `/menu` - Show main navigation menu
-• `/status` - View system status
-• `/setup` - Run setup wizard
-
-**Navigation:**
-• Use inline buttons for navigation
-• 📺 Channels - Manage source/destination channels
-• 🔗 Mappings - Configure forwarding rules
-• ⚙️ Settings - User preferences
-
-{f"**Admin Commands:**\\n• `/admin` - Administrator panel\\n• System management tools\\n" if is_admin(update.effective_user.id) else ""}
-
-💡 **Tip:** Use the interactive menus for the best experience!
-        """
+        user = update.effective_user
+        if not user or not self._is_authorized_user(user.id):
+            await update.message.reply_text("❌ Access denied.")
+            return
         
+        help_text = _HELP_ADMIN if self._is_admin_user(user.id) else _HELP_USER
         await update.message.reply_text(help_text, parse_mode='Markdown')
     
     async def handle_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /menu command to show main menu."""
         user = update.effective_user
-        if not user:
+        if not user or not self._is_authorized_user(user.id):
+            await update.message.reply_text("❌ Access denied.")
             return
         
         db_user = await self._get_or_create_user(user)
@@ -134,9 +371,13 @@ class HandlerRegistry:
     
     async def handle_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /status command."""
+        user = update.effective_user
+        if not user or not self._is_authorized_user(user.id):
+            await update.message.reply_text("❌ Access denied.")
+            return
+        
         try:
-            admin_commands = AdminCommands()
-            stats_result = await admin_commands.get_system_stats()
+            stats_result = await self.admin_commands.get_system_stats()
             message, keyboard = MenuFormatter.format_system_status(stats_result)
             await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
         except Exception as e:
@@ -150,7 +391,7 @@ class HandlerRegistry:
     async def handle_admin_panel(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /admin command (admin only)."""
         user = update.effective_user
-        if not user or not is_admin(user.id):
+        if not user or not self._is_admin_user(user.id):
             await update.message.reply_text("❌ Access denied. Administrator privileges required.")
             return
         
@@ -160,7 +401,8 @@ class HandlerRegistry:
     async def handle_setup(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /setup command to start setup wizard."""
         user = update.effective_user
-        if not user:
+        if not user or not self._is_admin_user(user.id):
+            await update.message.reply_text("❌ Admin access required for setup.")
             return
         
         # Start setup workflow
@@ -197,7 +439,7 @@ Ready to continue?
         query = update.callback_query
         user = update.effective_user
         
-        if not user:
+        if not user or not self._is_authorized_user(user.id):
             await query.answer("Access denied.", show_alert=True)
             return
         
@@ -205,32 +447,20 @@ Ready to continue?
         
         # Parse callback data
         callback_data = parse_callback_data(query.data)
-        action = CallbackAction(callback_data['action'])
+        handler = self._cb_handlers.get(callback_data['action'])
         
         try:
-            if action == CallbackAction.MAIN_MENU:
-                await self._handle_main_menu_callback(query, user)
-            elif action == CallbackAction.CHANNELS_LIST:
-                await self._handle_channels_list_callback(query, user, callback_data)
-            elif action == CallbackAction.CHANNEL_VIEW:
-                await self._handle_channel_view_callback(query, user, callback_data)
-            elif action == CallbackAction.MAPPINGS_LIST:
-                await self._handle_mappings_list_callback(query, user, callback_data)
-            elif action == CallbackAction.MAPPING_VIEW:
-                await self._handle_mapping_view_callback(query, user, callback_data)
-            elif action == CallbackAction.ADMIN_PANEL:
-                await self._handle_admin_panel_callback(query, user)
-            elif action == CallbackAction.SYSTEM_STATUS:
-                await self._handle_system_status_callback(query, user)
-            elif action == CallbackAction.SETTINGS:
-                await self._handle_settings_callback(query, user)
+            if handler:
+                # Resolve the database user once for the whole update
+                db_user = await self._user_for_update(update, context)
+                await handler(query, db_user, callback_data)
             else:
                 # Delegate to legacy handler migrator for existing functionality
-                await self.legacy_migrator.handle_callback_query(update, context)
+                await self.legacy_migrator.handle_callback_query(update, context, answered=True)
                 
         except Exception as e:
             logger.error(f"Error handling callback query: {e}")
-            await query.edit_message_text("❌ An error occurred. Please try again.")
+            await self._edit_message(query, "❌ An error occurred. Please try again.", parse_mode=None)
     
     async def handle_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle text messages for user input states."""
@@ -265,138 +495,167 @@ Ready to continue?
             await self.legacy_migrator.handle_message(update, context)
     
     # Helper methods for callback handling
-    async def _handle_main_menu_callback(self, query, user):
+    async def _handle_main_menu_callback(self, query, db_user, callback_data):
         """Handle main menu callback."""
-        db_user = await self._get_or_create_user(user)
         message, keyboard = MenuFormatter.format_main_menu(db_user)
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await self._edit_message(query, message, keyboard)
     
-    async def _handle_channels_list_callback(self, query, user, callback_data):
+    async def _handle_channels_list_callback(self, query, db_user, callback_data):
         """Handle channels list callback."""
+        after_id = callback_data.get('id', 0)
         page = callback_data.get('page', 0)
         
-        async with get_db_session() as session:
-            # Get channels with pagination
-            channels_query = select(Channel).offset(page * 10).limit(10)
-            result = await session.execute(channels_query)
-            channels = result.scalars().all()
-            
-            # Get total count for pagination
-            count_result = await session.execute(select(func.count(Channel.id)))
-            total_count = count_result.scalar()
-            
-            pagination = PaginationInfo(
-                current_page=page,
-                total_pages=(total_count + 9) // 10,
-                items_per_page=10,
-                total_items=total_count
-            )
-            
-            db_user = await self._get_or_create_user(user)
-            message, keyboard = MenuFormatter.format_channels_list(channels, pagination, db_user.role)
-            await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        channels, total_count = await self._run_db(self._load_channels_page, after_id)
+        
+        # The extra row only tells us a next page exists
+        has_next = len(channels) > PAGE_SIZE
+        channels = channels[:PAGE_SIZE]
+        
+        pagination = PaginationInfo(
+            current_page=page,
+            total_pages=max((total_count + PAGE_SIZE - 1) // PAGE_SIZE, page + 1),
+            items_per_page=PAGE_SIZE,
+            total_items=total_count,
+            next_after_id=channels[-1].id if has_next else None
+        )
+        
+        message, keyboard = MenuFormatter.format_channels_list(channels, pagination, db_user.role)
+        await self._edit_message(query, message, keyboard)
     
-    async def _handle_channel_view_callback(self, query, user, callback_data):
+    async def _handle_channel_view_callback(self, query, db_user, callback_data):
         """Handle channel view callback."""
         channel_id = callback_data.get('id')
         if not channel_id:
             return
         
-        async with get_db_session() as session:
-            result = await session.execute(select(Channel).where(Channel.id == channel_id))
-            channel = result.scalar_one_or_none()
-            
-            if channel:
-                db_user = await self._get_or_create_user(user)
-                message, keyboard = MenuFormatter.format_channel_view(channel, db_user.role)
-                await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        channel = await self._run_db(self._load_by_id, Channel, channel_id)
+        
+        if channel:
+            message, keyboard = MenuFormatter.format_channel_view(channel, db_user.role)
+            await self._edit_message(query, message, keyboard)
     
-    async def _handle_mappings_list_callback(self, query, user, callback_data):
+    async def _handle_mappings_list_callback(self, query, db_user, callback_data):
         """Handle mappings list callback."""
+        after_id = callback_data.get('id', 0)
         page = callback_data.get('page', 0)
         channel_filter = callback_data.get('channel_filter')
         
-        async with get_db_session() as session:
-            # Build query with optional channel filter
-            mappings_query = select(ForwardingMapping)
-            if channel_filter:
-                mappings_query = mappings_query.where(
-                    (ForwardingMapping.source_channel_id == channel_filter) |
-                    (ForwardingMapping.dest_channel_id == channel_filter)
-                )
-            
-            mappings_query = mappings_query.offset(page * 10).limit(10)
-            result = await session.execute(mappings_query)
-            mappings = result.scalars().all()
-            
-            # Get total count
-            count_query = select(func.count(ForwardingMapping.id))
-            if channel_filter:
-                count_query = count_query.where(
-                    (ForwardingMapping.source_channel_id == channel_filter) |
-                    (ForwardingMapping.dest_channel_id == channel_filter)
-                )
-            
-            count_result = await session.execute(count_query)
-            total_count = count_result.scalar()
-            
-            pagination = PaginationInfo(
-                current_page=page,
-                total_pages=(total_count + 9) // 10,
-                items_per_page=10,
-                total_items=total_count
-            )
-            
-            # Get channel filter object if needed
-            filter_channel = None
-            if channel_filter:
-                filter_result = await session.execute(select(Channel).where(Channel.id == channel_filter))
-                filter_channel = filter_result.scalar_one_or_none()
-            
-            db_user = await self._get_or_create_user(user)
-            message, keyboard = MenuFormatter.format_mappings_list(mappings, pagination, db_user.role, filter_channel)
-            await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        mappings, filter_channel, total_count = await self._run_db(
+            self._load_mappings_page, after_id, channel_filter
+        )
+        
+        has_next = len(mappings) > PAGE_SIZE
+        mappings = mappings[:PAGE_SIZE]
+        
+        pagination = PaginationInfo(
+            current_page=page,
+            total_pages=max((total_count + PAGE_SIZE - 1) // PAGE_SIZE, page + 1),
+            items_per_page=PAGE_SIZE,
+            total_items=total_count,
+            next_after_id=mappings[-1].id if has_next else None
+        )
+        
+        message, keyboard = MenuFormatter.format_mappings_list(mappings, pagination, db_user.role, filter_channel)
+        await self._edit_message(query, message, keyboard)
     
-    async def _handle_mapping_view_callback(self, query, user, callback_data):
+    async def _handle_mapping_view_callback(self, query, db_user, callback_data):
         """Handle mapping view callback."""
         mapping_id = callback_data.get('id')
         if not mapping_id:
             return
         
-        async with get_db_session() as session:
-            result = await session.execute(select(ForwardingMapping).where(ForwardingMapping.id == mapping_id))
-            mapping = result.scalar_one_or_none()
+        mapping = await self._run_db(self._load_by_id, ForwardingMapping, mapping_id, _MAPPING_CHANNELS)
+        
+        if mapping:
+            message, keyboard = MenuFormatter.format_mapping_view(mapping, db_user.role)
+            await self._edit_message(query, message, keyboard)
+    
+    async def _edit_message(self, query, text: str, keyboard=None, parse_mode: Optional[str] = 'Markdown') -> None:
+        """Edit the callback's message, ignoring repeated presses on an unchanged view."""
+        try:
+            await query.edit_message_text(text, reply_markup=keyboard, parse_mode=parse_mode)
+        except BadRequest as e:
+            # Telegram rejects edits that leave the message as it is; the query is already answered
+            if "message is not modified" not in str(e).lower():
+                raise
+    
+    # Database loaders; _run_db gives each one the update's session and closes it before replying
+    async def _run_db(self, loader, *args):
+        """Run a loader with one session, under the shared DB concurrency limit."""
+        async with self._db_pool:
+            async with get_db_session() as session:
+                return await loader(session, *args)
+    
+    async def _load_channels_page(self, session, after_id: int) -> Tuple[List[Any], int]:
+        """Load one keyset page of channel rows plus the cached total."""
+        result = await session.execute(_CHANNELS_PAGE_STMT, {'after_id': after_id})
+        channels = result.all()
+        total_count = await self._cached_count(session, ('channels', None), _CHANNELS_COUNT_STMT)
+        return channels, total_count
+    
+    async def _load_mappings_page(self, session, after_id: int,
+                                  channel_filter: Optional[int]) -> Tuple[List[Any], Optional[ChannelRef], int]:
+        """Load one keyset page of mapping rows, the filter channel and the cached total."""
+        filter_channel = None
+        
+        if channel_filter:
+            params = {'after_id': after_id, 'channel_id': channel_filter}
+            result = await session.execute(_FILTERED_MAPPINGS_PAGE_STMT, params)
+            rows = result.all()
+            filter_channel = ChannelRef(rows[0].channel_id, rows[0].channel_title) if rows else None
+            mappings = [row for row in rows if row.id is not None]
             
-            if mapping:
-                db_user = await self._get_or_create_user(user)
-                message, keyboard = MenuFormatter.format_mapping_view(mapping, db_user.role)
-                await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+            total_count = await self._cached_count(
+                session, ('mappings', channel_filter), _FILTERED_MAPPINGS_COUNT_STMT,
+                {'channel_id': channel_filter}
+            )
+        else:
+            result = await session.execute(_MAPPINGS_PAGE_STMT, {'after_id': after_id})
+            mappings = result.all()
+            total_count = await self._cached_count(session, ('mappings', None), _MAPPINGS_COUNT_STMT)
+        
+        return mappings, filter_channel, total_count
     
-    async def _handle_admin_panel_callback(self, query, user):
+    async def _load_by_id(self, session, model, object_id: int, options=()):
+        """Load a single row by primary key."""
+        return await session.get(model, object_id, options=options)
+    
+    async def _cached_count(self, session, key: Tuple[str, Optional[int]], count_stmt,
+                            params: Optional[Dict[str, Any]] = None) -> int:
+        """Return a list total, re-counting at most once per _COUNT_TTL."""
+        cached = self._count_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self._COUNT_TTL:
+            return cached[1]
+        
+        result = await session.execute(count_stmt, params)
+        total = result.scalar()
+        self._count_cache[key] = (time.monotonic(), total)
+        return total
+    
+    async def _handle_admin_panel_callback(self, query, db_user, callback_data):
         """Handle admin panel callback."""
-        if not is_admin(user.id):
-            await query.answer("Access denied.", show_alert=True)
+        if not self._is_admin_user(db_user.telegram_id):
+            # The query was answered by the dispatcher, so report on the message itself
+            await self._edit_message(query, "❌ Access denied. Administrator privileges required.", parse_mode=None)
             return
         
         message, keyboard = MenuFormatter.format_admin_panel()
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await self._edit_message(query, message, keyboard)
     
-    async def _handle_system_status_callback(self, query, user):
+    async def _handle_system_status_callback(self, query, db_user, callback_data):
         """Handle system status callback."""
         try:
-            admin_commands = AdminCommands()
-            stats_result = await admin_commands.get_system_stats()
+            stats_result = await self.admin_commands.get_system_stats()
             message, keyboard = MenuFormatter.format_system_status(stats_result)
-            await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+            await self._edit_message(query, message, keyboard)
         except Exception as e:
             logger.error(f"Error getting system status: {e}")
-            await query.edit_message_text("❌ Error loading system status. Please try again.")
+            await self._edit_message(query, "❌ Error loading system status. Please try again.", parse_mode=None)
     
-    async def _handle_settings_callback(self, query, user):
+    async def _handle_settings_callback(self, query, db_user, callback_data):
         """Handle settings callback."""
-        db_user = await self._get_or_create_user(user)
         message, keyboard = MenuFormatter.format_settings_menu(db_user.role)
-        await query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await self._edit_message(query, message, keyboard)
     
     async def _process_valid_input(self, update, user, input_type: str, input_text: str):
         """Process validated user input."""
@@ -418,282 +677,97 @@ Ready to continue?
         state_manager.clear_user_state(user.id)
     
     # User management helpers
-    async def _register_user(self, telegram_user) -> User:
+    async def _register_user(self, session, telegram_user) -> User:
         """Register or update user in database."""
-        async with get_db_session() as session:
-            # Check if user exists
-            result = await session.execute(
-                select(User).where(User.telegram_id == telegram_user.id)
+        # Single upsert round-trip; updated_at doubles as the last-seen marker
+        role = UserRole.ADMINISTRATOR if is_admin(telegram_user.id) else UserRole.OPERATOR
+        stmt = (
+            pg_insert(User)
+            .values(telegram_id=telegram_user.id, role=role)
+            .on_conflict_do_update(
+                index_elements=[User.telegram_id],
+                set_={'updated_at': func.now()}
             )
-            user = result.scalar_one_or_none()
-            
-            if user:
-                # Update existing user
-                user.username = telegram_user.username
-                user.last_seen = func.now()
-            else:
-                # Create new user
-                role = UserRole.ADMINISTRATOR if is_admin(telegram_user.id) else UserRole.USER
-                user = User(
-                    telegram_id=telegram_user.id,
-                    username=telegram_user.username,
-                    role=role
-                )
-                session.add(user)
-            
-            await session.commit()
-            await session.refresh(user)
-            return user
-    
-    async def _get_or_create_user(self, telegram_user) -> User:
-        """Get or create user in database."""
-        return await self._register_user(telegram_user)
-    
-    # Command handlers
-    async def handle_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Enhanced /start command with system status and main menu."""
-        user = update.effective_user
-        if not user:
-            return
+            .returning(User)
+        )
+        result = await session.execute(stmt)
+        user = result.scalar_one()
         
-        # Register or update user in database
-        db_user = await self._register_user(user)
-        
-        # Clear any existing state
-        state_manager.clear_user_state(user.id)
-        
-        # Show main menu
-        message, keyboard = MenuFormatter.format_main_menu(db_user)
-        await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
+        await session.commit()
+        return user
     
-    async def handle_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Enhanced /help command."""
-        user = update.effective_user
-        if not user or not await self._is_authorized_user(user.id):
-            return
-        
-        is_admin_user = await self._is_admin_user(user.id)
-        
-        help_text = """📚 **Available Commands:**
-
-**General Commands:**
-• /start - System status and main menu
-• /help - Show this help message  
-• /status - Detailed system status
-
-**Channel Management:**
-• Browse and manage forwarding lists
-• Add/remove source and destination channels
-• Configure forwarding modes (forward/copy)
-• Set up content filters
-
-**Advanced Features:**
-• Dual-client architecture (Bot API + MTProto)
-• Private channel access via user session
-• Smart deduplication and retry logic
-• FloodWait handling and rate limiting"""
-        
-        if is_admin_user:
-            help_text += """
-
-**Admin Commands:**
-• /admin - Access admin panel
-• /setup - Initial system setup
-• Monitor queue status and performance
-• Manage user permissions
-• View system logs and metrics"""
-        
-        await update.message.reply_text(help_text, parse_mode='Markdown')
-    
-    async def handle_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Show main menu."""
-        user = update.effective_user
-        if not user or not await self._is_authorized_user(user.id):
-            return
-        
-        db_user = await self._get_or_create_user(user)
-        message, keyboard = MenuFormatter.format_main_menu(db_user)
-        await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
-    
-    async def handle_status(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Detailed system status command."""
-        user = update.effective_user
-        if not user or not await self._is_authorized_user(user.id):
-            return
-        
-        # Collect comprehensive status
-        client_status = self.client_factory.get_client_status()
-        engine_stats = await self.forwarding_engine.get_statistics()
-        queue_stats = await self.forwarding_engine.queue_manager.get_queue_statistics()
-        
-        status_text = f"""📊 **Detailed System Status**
-
-**Client Status:**
-🤖 Bot Client: {'✅ Running' if client_status['bot_client']['running'] else '❌ Stopped'}
-👤 User Client: {'✅ Running' if client_status['user_client']['running'] else '❌ Stopped'}
-🔐 User Authorized: {'✅ Yes' if client_status['user_client']['authorized'] else '❌ No'}
-
-**Forwarding Engine:**
-⚙️ Status: {'✅ Running' if engine_stats['engine_running'] else '❌ Stopped'}
-👷 Workers: {engine_stats['workers_running']} active
-
-**Message Processing:**
-📥 Pending: {engine_stats['message_counts']['pending']}
-⚡ Processing: {engine_stats['message_counts']['processing']}
-✅ Successful: {engine_stats['message_counts']['success']}
-❌ Failed: {engine_stats['message_counts']['failed']}
-🔄 Retrying: {engine_stats['message_counts']['retrying']}
-
-**Queue Status:**
-📋 Main Queue: {queue_stats['queue_sizes'].get('main', 0)}
-⏰ Retry Queue: {queue_stats['queue_sizes'].get('retry', 0)}
-🚫 FloodWait Queue: {queue_stats['queue_sizes'].get('flood_wait', 0)}
-💾 Failed Queue: {queue_stats['queue_sizes'].get('failed', 0)}
-
-**Configuration:**
-🔧 Max Concurrent: {settings.max_concurrent_forwards}
-🔄 Max Retries: {settings.max_retry_attempts}
-⏱️ FloodWait Multiplier: {settings.flood_wait_multiplier}"""
-        
-        await update.message.reply_text(status_text, parse_mode='Markdown')
+    async def _get_or_create_user(self, telegram_user) -> User:
+        """Get or create user, serving recent rows from the in-memory cache."""
+        cached = self._user_cache.get(telegram_user.id)
+        if cached and time.monotonic() - cached[0] < self._USER_TTL:
+            # Activity is written later in a batch, off the request path
+            self._pending_seen[telegram_user.id] = datetime.now(timezone.utc)
+            return cached[1]
+        
+        lock = self._user_locks.get(telegram_user.id)
+        if lock is None:
+            lock = self._user_locks[telegram_user.id] = asyncio.Lock()
+        
+        async with lock:
+            # Another callback may have refreshed the entry while we waited
+            cached = self._user_cache.get(telegram_user.id)
+            if cached and time.monotonic() - cached[0] < self._USER_TTL:
+                return cached[1]
+            
+            # The upsert also bumps updated_at, so activity is recorded once per TTL
+            user = await self._run_db(self._register_user, telegram_user)
+            self._user_cache[telegram_user.id] = (time.monotonic(), user)
+            return user
     
-    async def handle_admin(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Admin panel command."""
-        user = update.effective_user
-        if not user or not await self._is_admin_user(user.id):
-            await update.message.reply_text("❌ Admin access required.")
+    async def _flush_seen_loop(self) -> None:
+        """Periodically write batched user activity."""
+        while True:
+            try:
+                await asyncio.sleep(self._SEEN_FLUSH_INTERVAL)
+                await self._flush_seen_users()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error flushing user activity: {e}")
+    
+    async def _flush_seen_users(self) -> None:
+        """Write all pending last-seen timestamps with a single UPDATE."""
+        if not self._pending_seen:
             return
         
-        db_user = await self._get_or_create_user(user)
-        message, keyboard = MenuFormatter.format_admin_panel(db_user)
-        await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
-    
-    async def handle_setup(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Initial system setup command."""
-        user = update.effective_user
-        if not user or not await self._is_admin_user(user.id):
-            await update.message.reply_text("❌ Admin access required for setup.")
-            return
+        pending, self._pending_seen = self._pending_seen, {}
         
-        # Check if user client needs authentication
-        if not self.client_factory.user_client.is_authorized:
-            setup_text = """🔧 **System Setup Required**
-
-The user client (MTProto) needs to be authenticated for private channel access.
-
-**Setup Steps:**
-1. Provide your phone number
-2. Enter verification code from Telegram
-3. Enter 2FA password if enabled
-4. Complete authentication
-
-This is required for accessing private channels and advanced forwarding features.
-
-Please provide your phone number (with country code, e.g., +1234567890):"""
-            
-            # Set user state for phone input
-            state_manager.set_user_state(
-                user.id, 
-                UserState.AWAITING_PHONE_NUMBER,
-                context={'setup_step': 'phone'}
+        async def write(session) -> None:
+            await session.execute(
+                update(User)
+                .where(User.telegram_id.in_(list(pending)))
+                .values(updated_at=case(pending, value=User.telegram_id))
+                .execution_options(synchronize_session=False)
             )
-            await update.message.reply_text(setup_text, parse_mode='Markdown')
-        else:
-            await update.message.reply_text("✅ System is already set up and ready to use!")
-    
-    # Callback query handlers
-    async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-        """Handle callback queries from inline keyboards."""
-        query = update.callback_query
-        user = update.effective_user
-        
-        if not user or not await self._is_authorized_user(user.id):
-            await query.answer("Access denied.", show_alert=True)
-            return
-        
-        await query.answer()
+            await session.commit()
         
-        # Parse callback data
-        try:
-            callback_data = parse_callback_data(query.data)
-            action = callback_data.get('action')
-            
-            if action == CallbackAction.MAIN_MENU:
-                await self._handle_main_menu_callback(update, context, callback_data)
-            elif action == CallbackAction.CHANNELS_MENU:
-                await self._handle_channels_callback(update, context, callback_data)
-            elif action == CallbackAction.MAPPINGS_MENU:
-                await self._handle_mappings_callback(update, context, callback_data)
-            elif action == CallbackAction.ADMIN_PANEL:
-                await self._handle_admin_callback(update, context, callback_data)
-            elif action == CallbackAction.SYSTEM_STATUS:
-                await self._handle_status_callback(update, context, callback_data)
-            elif action == CallbackAction.SETTINGS:
-                await self._handle_settings_callback(update, context, callback_data)
-            else:
-                # Delegate to legacy handler migrator for existing functionality
-                await self.legacy_migrator.handle_callback_query(update, context)
-                
-        except Exception as e:
-            logger.error(f"Error handling callback query: {e}")
-            # Fallback to legacy handler
-            await self.legacy_migrator.handle_callback_query(update, context)
+        await self._run_db(write)
     
-    async def _handle_main_menu_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: dict) -> None:
-        """Handle main menu callbacks."""
-        user = update.effective_user
-        db_user = await self._get_or_create_user(user)
+    async def _user_for_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> User:
+        """Get the database user, querying at most once per update."""
+        cached = context.user_data.get('_db_user')
+        if cached and cached[0] == update.update_id:
+            return cached[1]
         
-        sub_action = callback_data.get('sub_action')
-        
-        if sub_action == 'channels':
-            message, keyboard = MenuFormatter.format_channels_menu(db_user)
-            await update.callback_query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
-        elif sub_action == 'mappings':
-            message, keyboard = MenuFormatter.format_mappings_menu(db_user)
-            await update.callback_query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
-        elif sub_action == 'status':
-            message, keyboard = MenuFormatter.format_system_status(db_user)
-            await update.callback_query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
-        elif sub_action == 'settings':
-            message, keyboard = MenuFormatter.format_settings_menu(db_user)
-            await update.callback_query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
-    
-    async def _handle_channels_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: dict) -> None:
-        """Handle channel management callbacks."""
-        # Delegate to legacy handler for now
-        await self.legacy_migrator.handle_callback_query(update, context)
-    
-    async def _handle_mappings_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: dict) -> None:
-        """Handle mapping management callbacks."""
-        # Delegate to legacy handler for now
-        await self.legacy_migrator.handle_callback_query(update, context)
-    
-    async def _handle_admin_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: dict) -> None:
-        """Handle admin panel callbacks."""
-        user = update.effective_user
-        if not await self._is_admin_user(user.id):
-            await update.callback_query.answer("Admin access required.", show_alert=True)
-            return
-        
-        # Delegate to legacy handler for now
-        await self.legacy_migrator.handle_callback_query(update, context)
-    
-    async def _handle_status_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: dict) -> None:
-        """Handle system status callbacks."""
-        # Refresh status display
-        await self.handle_status(update, context)
-    
-    async def _handle_settings_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: dict) -> None:
-        """Handle settings callbacks."""
-        # Delegate to legacy handler for now
-        await self.legacy_migrator.handle_callback_query(update, context)
+        db_user = await self._get_or_create_user(update.effective_user)
+        context.user_data['_db_user'] = (update.update_id, db_user)
+        return db_user
     
     # Message handlers
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle text messages for user input states."""
+        # Nothing to process in an empty or whitespace-only message
+        text = update.message.text if update.message else None
+        if not text or not text.strip():
+            return
+        
         user = update.effective_user
-        if not user or not await self._is_authorized_user(user.id):
+        if not user or not self._is_authorized_user(user.id):
             return
         
         user_state = state_manager.get_user_state(user.id)
@@ -709,43 +783,69 @@ Please provide your phone number (with country code, e.g., +1234567890):"""
         """Process user input based on current conversation state."""
         user = update.effective_user
         message_text = update.message.text
+        validate_input = state_manager.validate_input
+        clear_state = state_manager.clear_user_state
+        
+        # Cleared once in finally; invalid input keeps the user in the flow
+        clear = True
+        reply = None
         
         try:
             if user_state.state == UserState.AWAITING_PHONE_NUMBER:
                 # Validate phone number format
-                if state_manager.validate_input(message_text, 'phone'):
-                    # TODO: Implement phone number authentication flow
-                    await update.message.reply_text(
-                        "📱 Phone number received. Authentication flow will be implemented."
-                    )
-                    state_manager.clear_user_state(user.id)
-                else:
-                    await update.message.reply_text(
-                        "❌ Invalid phone number format. Please use international format (e.g., +1234567890):"
-                    )
+                # TODO: Implement phone number authentication flow
+                is_valid = validate_input(message_text, 'phone')
+                reply = (
+                    "📱 Phone number received. Authentication flow will be implemented." if is_valid else
+                    "❌ Invalid phone number format. Please use international format (e.g., +1234567890):"
+                )
             
             elif user_state.state == UserState.AWAITING_CHANNEL_INPUT:
                 # Validate channel input
-                if state_manager.validate_input(message_text, 'channel'):
-                    # TODO: Process channel addition
-                    await update.message.reply_text(
-                        "📺 Channel input received. Processing will be implemented."
-                    )
-                    state_manager.clear_user_state(user.id)
-                else:
-                    await update.message.reply_text(
-                        "❌ Invalid channel format. Please provide a valid channel username or ID:"
-                    )
+                # TODO: Process channel addition
+                is_valid = validate_input(message_text, 'channel')
+                reply = (
+                    "📺 Channel input received. Processing will be implemented." if is_valid else
+                    "❌ Invalid channel format. Please provide a valid channel username or ID:"
+                )
             
             else:
-                # Unknown state, clear and delegate to legacy handler
-                state_manager.clear_user_state(user.id)
+                # Unknown state, delegate to legacy handler
                 await self.legacy_migrator.handle_message(update, context)
+                return
+            
+            clear = is_valid
+            await update.message.reply_text(reply)
+        
+        except RetryAfter as e:
+            # Another reply now would be rejected too; send it once the wait is over
+            logger.warning(f"Rate limited replying to user input, retrying in {e.retry_after}s")
+            self._reply_later(update.message, reply or "❌ An error occurred. Please try again.", e.retry_after)
                 
         except Exception as e:
             logger.error(f"Error processing user input: {e}")
-            state_manager.clear_user_state(user.id)
-            await update.message.reply_text("❌ An error occurred. Please try again.")
+            clear = True
+            try:
+                await update.message.reply_text("❌ An error occurred. Please try again.")
+            except TelegramError:
+                pass
+        
+        finally:
+            if clear:
+                clear_state(user.id)
+    
+    def _reply_later(self, message, text: str, delay: float) -> None:
+        """Send a reply in the background after a flood wait."""
+        async def send() -> None:
+            await asyncio.sleep(delay)
+            try:
+                await message.reply_text(text)
+            except TelegramError as e:
+                logger.warning(f"Delayed reply failed: {e}")
+        
+        task = asyncio.create_task(send())
+        self._delayed_replies.add(task)
+        task.add_done_callback(self._delayed_replies.discard)
     
     # Error handler
     async def handle_error(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -753,8 +853,6 @@ Please provide your phone number (with country code, e.g., +1234567890):"""
         logger.error("Bot error occurred", error=str(context.error), exc_info=context.error)
         
         # Handle specific error types
-        from telegram.error import RetryAfter, TimedOut, TelegramError
-        
         if isinstance(context.error, RetryAfter):
             logger.warning(f"Rate limited: retry after {context.error.retry_after} seconds")
         elif isinstance(context.error, TimedOut):
@@ -763,10 +861,21 @@ Please provide your phone number (with country code, e.g., +1234567890):"""
             logger.error(f"Telegram API error: {context.error}")
     
     # Helper methods
-    async def _is_authorized_user(self, user_id: int) -> bool:
+    def _is_authorized_user(self, user_id: int) -> bool:
         """Check if user is authorized to use the bot."""
-        return is_admin(user_id)  # For now, only admins can use the bot
+        return self._cached_is_admin(user_id)  # For now, only admins can use the bot
     
-    async def _is_admin_user(self, user_id: int) -> bool:
+    def _is_admin_user(self, user_id: int) -> bool:
         """Check if user has admin privileges."""
-        return is_admin(user_id)
+        return self._cached_is_admin(user_id)
+    
+    def _cached_is_admin(self, user_id: int) -> bool:
+        """Check admin status, reusing a recent result for the same user."""
+        cached = self._admin_cache.get(user_id)
+        now = time.monotonic()
+        if cached and now - cached[1] < self._ADMIN_TTL:
+            return cached[0]
+        
+        result = is_admin(user_id)
+        self._admin_cache[user_id] = (result, now)
+        return result
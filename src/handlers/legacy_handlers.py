@@ -2,8 +2,11 @@
 Legacy handler migrator for preserving existing bot functionality.
 Adapts the current SQLite-based handlers to work with the new architecture.
 """
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
 
 from telegram import Update
 from telegram.ext import ContextTypes, Application
@@ -13,17 +16,53 @@ from src.database import get_db_session
 
 logger = logging.getLogger(__name__)
 
+# Grouped legacy callback actions sharing one handler
+_FOLDER_ACTIONS = frozenset({"view_folder", "create_folder_start", "rename_folder_start", "delete_folder_start"})
+_LIST_ACTIONS = frozenset({"config_list", "create_list_start", "rename_list_start", "delete_list_start"})
+_CHANNEL_ACTIONS = frozenset({"add_sources_start", "add_dest_start", "config_dests"})
+
 
 class LegacyHandlerMigrator:
     """Migrates and adapts existing bot handlers to new architecture."""
     
+    __slots__ = (
+        "client_factory",
+        "user_states",
+        "_dialogs_cache",
+        "_dialogs_lock",
+        "_initialized",
+    )
+    
+    # Callback action -> handler method name, called as handler(query, action, rest)
+    _CALLBACK_DISPATCH = {
+        "main_menu": "_show_main_menu",
+        "manage_lists_root": "_show_lists_management",
+        **dict.fromkeys(_FOLDER_ACTIONS, "_handle_folder_actions"),
+        **dict.fromkeys(_LIST_ACTIONS, "_handle_list_actions"),
+        **dict.fromkeys(_CHANNEL_ACTIONS, "_handle_channel_management"),
+    }
+    
+    # State action -> input handler method name, called as handler(update, text, rest)
+    _MESSAGE_DISPATCH = {
+        "waiting_for_folder_name": "_handle_folder_name_input",
+        "waiting_for_list_name": "_handle_list_name_input",
+        "waiting_for_search_query": "_handle_search_query_input",
+        "waiting_for_link": "_handle_link_input",
+    }
+    
+    # Seconds the lower-cased dialog index is shared between searches
+    _DIALOGS_TTL = 30.0
+    
     def __init__(self, client_factory: ClientFactory):
         self.client_factory = client_factory
-        self.user_states: Dict[str, str] = {}
-        self.user_search_cache: Dict[str, Any] = {}
+        self.user_states: Dict[int, str] = {}
+        # ([(lower-cased title, dialog), ...], built_at) from the user client; the
+        # lock keeps concurrent searches down to a single get_dialogs call
+        self._dialogs_cache: Optional[Tuple[List[Tuple[str, Dict[str, Any]]], float]] = None
+        self._dialogs_lock = asyncio.Lock()
         self._initialized = False
     
-    async def initialize(self) -> None:
+    def initialize(self) -> None:
         """Initialize the legacy handler migrator."""
         if self._initialized:
             return
@@ -32,12 +71,12 @@ class LegacyHandlerMigrator:
         
         # Initialize state tracking
         self.user_states = {}
-        self.user_search_cache = {}
+        self._dialogs_cache = None
         
         self._initialized = True
         logger.info("Legacy handler migrator initialized")
     
-    async def register_legacy_handlers(self, application: Application) -> None:
+    def register_legacy_handlers(self, application: Application) -> None:
         """Register legacy handlers with the bot application."""
         logger.info("Registering legacy handlers...")
         
@@ -49,75 +88,54 @@ class LegacyHandlerMigrator:
     
     async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle callback queries using legacy logic adapted for new architecture."""
+        # Bound once per update; these run on every callback
+        debug, warning = logger.debug, logger.warning
         query = update.callback_query
         data = query.data
         user_id = query.from_user.id
-        message = query.message
         
-        logger.debug(f"Legacy callback handler: {data} from user {user_id}")
+        debug("Legacy callback handler: %s from user %s", data, user_id)
         
-        # Parse callback data
-        parts = data.split(':')
-        action = parts[0]
+        # Only the action is needed to dispatch; handlers split the rest if they use it
+        action, _, rest = data.partition(':')
         
-        # Handle different callback actions
         if action == "noop":
             return
         
-        # Main menu actions
-        elif action == "main_menu":
-            await self._show_main_menu(query, message)
-        
-        elif action == "manage_lists_root":
-            await self._show_lists_management(query, message)
-        
-        # Legacy folder and list management
-        elif action in ["view_folder", "create_folder_start", "rename_folder_start", "delete_folder_start"]:
-            await self._handle_folder_actions(query, action, parts)
-        
-        elif action in ["config_list", "create_list_start", "rename_list_start", "delete_list_start"]:
-            await self._handle_list_actions(query, action, parts)
-        
-        # Source and destination management
-        elif action in ["add_sources_start", "add_dest_start", "config_dests"]:
-            await self._handle_channel_management(query, action, parts)
+        handler_name = self._CALLBACK_DISPATCH.get(action)
+        if handler_name is None:
+            warning("Unhandled legacy callback action: %s", action)
+            return
         
-        # Other legacy actions
-        else:
-            logger.warning(f"Unhandled legacy callback action: {action}")
+        await getattr(self, handler_name)(query, action, rest)
     
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle text messages using legacy state logic."""
+        debug, warning = logger.debug, logger.warning
         user_id = update.effective_user.id
-        state_key = str(user_id)
-        text = update.message.text.strip()
         
-        if state_key not in self.user_states or not text:
+        # Most messages come from users with no pending input; check that first
+        state = self.user_states.get(user_id)
+        if state is None:
             return
         
-        logger.debug(f"Legacy message handler: user {user_id} in state {self.user_states[state_key]}")
-        
-        # Handle different user states
-        state = self.user_states[state_key]
-        parts = state.split(':')
-        action = parts[0]
-        
-        if action == "waiting_for_folder_name":
-            await self._handle_folder_name_input(update, text)
+        text = update.message.text.strip()
+        if not text:
+            return
         
-        elif action == "waiting_for_list_name":
-            await self._handle_list_name_input(update, text, parts)
+        debug("Legacy message handler: user %s in state %s", user_id, state)
         
-        elif action == "waiting_for_search_query":
-            await self._handle_search_query_input(update, text, parts)
+        # Handle different user states
+        action, _, rest = state.partition(':')
         
-        elif action == "waiting_for_link":
-            await self._handle_link_input(update, text, parts)
+        handler_name = self._MESSAGE_DISPATCH.get(action)
+        if handler_name is None:
+            warning("Unhandled legacy message state: %s", action)
+            return
         
-        else:
-            logger.warning(f"Unhandled legacy message state: {action}")
+        await getattr(self, handler_name)(update, text, rest)
     
-    async def _show_main_menu(self, query, message) -> None:
+    async def _show_main_menu(self, query, action: str, rest: str) -> None:
         """Show the main menu (legacy compatible)."""
         menu_text = """🤖 **Telegram Forwarding Bot**
 
@@ -130,9 +148,9 @@ class LegacyHandlerMigrator:
 Choose an option below:"""
         
         # TODO: Create main menu keyboard
-        await message.edit_text(menu_text, parse_mode='Markdown')
+        await query.message.edit_text(menu_text, parse_mode='Markdown')
     
-    async def _show_lists_management(self, query, message) -> None:
+    async def _show_lists_management(self, query, action: str, rest: str) -> None:
         """Show lists management interface (legacy compatible)."""
         # This would integrate with the new database schema
         # For now, show a placeholder
@@ -150,122 +168,139 @@ Choose an option below:"""
 Your existing lists from the SQLite database will be migrated to the new PostgreSQL schema automatically."""
         
         # TODO: Create lists management keyboard
-        await message.edit_text(lists_text, parse_mode='Markdown')
+        await query.message.edit_text(lists_text, parse_mode='Markdown')
     
-    async def _handle_folder_actions(self, query, action: str, parts: list) -> None:
+    async def _handle_folder_actions(self, query, action: str, rest: str) -> None:
         """Handle folder-related actions (legacy compatible)."""
-        logger.info(f"Handling folder action: {action}")
+        logger.info("Handling folder action: %s", action)
         
         # Placeholder for folder management logic
         # This would need to be adapted to work with the new database schema
         
         await query.answer("Folder management will be available after migration.")
     
-    async def _handle_list_actions(self, query, action: str, parts: list) -> None:
+    async def _handle_list_actions(self, query, action: str, rest: str) -> None:
         """Handle list-related actions (legacy compatible)."""
-        logger.info(f"Handling list action: {action}")
+        logger.info("Handling list action: %s", action)
         
         # Placeholder for list management logic
         # This would need to be adapted to work with the new database schema
         
         await query.answer("List management will be available after migration.")
     
-    async def _handle_channel_management(self, query, action: str, parts: list) -> None:
+    async def _handle_channel_management(self, query, action: str, rest: str) -> None:
         """Handle channel management actions (legacy compatible)."""
-        logger.info(f"Handling channel action: {action}")
+        logger.info("Handling channel action: %s", action)
         
         # This would integrate with the new Channel and ForwardingMapping models
         
         await query.answer("Channel management will be available after migration.")
     
-    async def _handle_folder_name_input(self, update, text: str) -> None:
+    async def _handle_folder_name_input(self, update, text: str, rest: str) -> None:
         """Handle folder name input (legacy compatible)."""
-        user_id = update.effective_user.id
-        
-        # Remove user from state
-        self.user_states.pop(str(user_id), None)
+        self._finalize_input(update.effective_user.id)
         
         # TODO: Create folder in new database schema
-        await update.message.reply_text(f"✅ Folder '{text}' will be created after migration.")
-        await update.message.delete()
+        await self._reply_and_delete(update, f"✅ Folder '{text}' will be created after migration.")
     
-    async def _handle_list_name_input(self, update, text: str, parts: list) -> None:
+    async def _handle_list_name_input(self, update, text: str, rest: str) -> None:
         """Handle list name input (legacy compatible)."""
-        user_id = update.effective_user.id
-        
-        # Remove user from state
-        self.user_states.pop(str(user_id), None)
+        self._finalize_input(update.effective_user.id)
         
         # TODO: Create list in new database schema
-        await update.message.reply_text(f"✅ List '{text}' will be created after migration.")
-        await update.message.delete()
+        await self._reply_and_delete(update, f"✅ List '{text}' will be created after migration.")
     
-    async def _handle_search_query_input(self, update, text: str, parts: list) -> None:
+    async def _handle_search_query_input(self, update, text: str, rest: str) -> None:
         """Handle search query input (legacy compatible)."""
-        user_id = update.effective_user.id
-        
-        # Remove user from state
-        self.user_states.pop(str(user_id), None)
+        self._finalize_input(update.effective_user.id)
         
         # Use the new user client for searching
         try:
-            dialogs = await self.client_factory.user_client.get_dialogs(limit=100)
+            indexed = await self._get_dialogs_cached()
             
             # Filter dialogs based on search query
-            search_results = [
-                dialog for dialog in dialogs 
-                if text.lower() in dialog['title'].lower()
-            ]
+            query_text = text.lower()
+            matches = (dialog for title, dialog in indexed if query_text in title)
             
-            self.user_search_cache[str(user_id)] = search_results
+            # Keep the top results and only count the rest
+            top_results = list(islice(matches, 5))
+            total = len(top_results) + sum(1 for _ in matches)
             
-            result_text = f"🔍 Found {len(search_results)} results for '{text}'"
-            if search_results:
+            result_text = f"🔍 Found {total} results for '{text}'"
+            if top_results:
                 result_text += "\n\nTop results:\n"
-                for i, dialog in enumerate(search_results[:5]):
+                for i, dialog in enumerate(top_results):
                     result_text += f"{i+1}. {dialog['title']} ({dialog['type']})\n"
             
-            await update.message.reply_text(result_text)
-            
         except Exception as e:
-            logger.error(f"Error in search: {e}")
-            await update.message.reply_text("❌ Search failed. Please try again.")
+            logger.error("Error in search: %s", e)
+            result_text = "❌ Search failed. Please try again."
         
-        await update.message.delete()
+        await self._reply_and_delete(update, result_text)
     
-    async def _handle_link_input(self, update, text: str, parts: list) -> None:
+    async def _handle_link_input(self, update, text: str, rest: str) -> None:
         """Handle link/ID input (legacy compatible)."""
-        user_id = update.effective_user.id
-        
-        # Remove user from state
-        self.user_states.pop(str(user_id), None)
+        self._finalize_input(update.effective_user.id)
         
         # Use the new user client to get chat info
         try:
             chat_info = await self.client_factory.user_client.get_entity_info(text)
             
             if chat_info:
-                await update.message.reply_text(
+                reply_text = (
                     f"✅ Found: {chat_info['title']} ({chat_info['type']})\n"
                     f"This channel will be added after migration."
                 )
             else:
-                await update.message.reply_text("❌ Could not find or access this chat.")
+                reply_text = "❌ Could not find or access this chat."
                 
         except Exception as e:
-            logger.error(f"Error getting chat info: {e}")
-            await update.message.reply_text("❌ Failed to get chat information.")
+            logger.error("Error getting chat info: %s", e)
+            reply_text = "❌ Failed to get chat information."
         
-        await update.message.delete()
+        await self._reply_and_delete(update, reply_text)
+    
+    def _finalize_input(self, user_id: int) -> None:
+        """End the user's input flow."""
+        self.user_states.pop(user_id, None)
+    
+    async def _reply_and_delete(self, update, text: str) -> None:
+        """Reply to the user's input and delete it, sending both requests at once."""
+        # The delete may land first; in groups the reply would otherwise quote a missing message
+        results = await asyncio.gather(
+            update.message.reply_text(text, allow_sending_without_reply=True),
+            update.message.delete(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Failed to finish input reply: %s", result)
+    
+    async def _get_dialogs_cached(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Get dialogs paired with lower-cased titles, shared by all users until the TTL expires."""
+        cached = self._dialogs_cache
+        if cached and time.monotonic() - cached[1] < self._DIALOGS_TTL:
+            return cached[0]
+        
+        async with self._dialogs_lock:
+            # Another search may have refreshed the cache while we waited
+            cached = self._dialogs_cache
+            if cached and time.monotonic() - cached[1] < self._DIALOGS_TTL:
+                return cached[0]
+            
+            dialogs = await self.client_factory.user_client.get_dialogs(limit=100)
+            indexed = [(dialog['title'].lower(), dialog) for dialog in dialogs]
+            self._dialogs_cache = (indexed, time.monotonic())
+            return indexed
     
     def set_user_state(self, user_id: int, state: str) -> None:
         """Set user state for input handling."""
-        self.user_states[str(user_id)] = state
+        self.user_states[user_id] = state
     
     def get_user_state(self, user_id: int) -> Optional[str]:
         """Get current user state."""
-        return self.user_states.get(str(user_id))
+        return self.user_states.get(user_id)
     
     def clear_user_state(self, user_id: int) -> None:
         """Clear user state."""
-        self.user_states.pop(str(user_id), None)
+        self.user_states.pop(user_id, None)
@@ -6,19 +6,71 @@ handlers to work with the new python-telegram-bot architecture.
 """
 
 import asyncio
-from typing import Optional, Dict, Any, List
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, RetryAfter
 from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
 import structlog
+from sqlalchemy import select, func
+from sqlalchemy.orm import aliased
 
 from ..database.models import User, Channel, ForwardingMapping
-from ..database.connection import get_session
+from ..database.connection import db_manager
 from ..config.settings import settings
 from ..core.forwarding_engine import ForwardingEngine
 from ..clients.client_factory import ClientFactory
 
 logger = structlog.get_logger(__name__)
 
+# Rows shown per legacy list page
+PAGE_SIZE = 10
+
+# Both ends of a mapping are channels, so the list query joins Channel twice
+_SourceChannel = aliased(Channel)
+_DestChannel = aliased(Channel)
+
+# Awaiting-input states kept at most, and seconds before one expires
+MAX_USER_STATES = 10_000
+USER_STATE_TTL = 600.0
+
+
+@dataclass(slots=True)
+class LegacyUserState:
+    """Pending input for a user in the legacy flow."""
+    input_type: str
+    awaiting_input: bool = True
+    extra: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+
+
+# Prefixes that mark a message as a channel reference
+_CHANNEL_PREFIXES = ('@', 'https://t.me/')
+
+# MarkdownV2 replies for accepted input; {name} must be escaped for a code entity
+_CHANNEL_TEMPLATE = (
+    "📺 Channel `{name}` will be processed\\.\n\n"
+    "⚠️ *Note*: Channel processing is being migrated to the new system\\. "
+    "Full functionality will be available soon\\."
+)
+_FOLDER_TEMPLATE = (
+    "📁 Folder `{name}` will be created\\.\n\n"
+    "⚠️ *Note*: Folder management is being migrated to the new system\\. "
+    "Full functionality will be available soon\\."
+)
+_LIST_TEMPLATE = (
+    "📋 List `{name}` will be created\\.\n\n"
+    "⚠️ *Note*: List management is being migrated to the new system\\. "
+    "Full functionality will be available soon\\."
+)
+
+# Legacy commands that now live under /menu
+_MIGRATED_COMMANDS = frozenset({'/folders', '/lists', '/channels', '/mappings'})
+
 
 class LegacyHandlerMigrator:
     """
@@ -28,20 +80,140 @@ class LegacyHandlerMigrator:
     architecture, allowing gradual migration while preserving functionality.
     """
     
+    # Callback action prefix -> handler method name
+    _ROUTES = {
+        "main": "_handle_main_menu_legacy",
+        "folders": "_handle_folders_legacy",
+        "lists": "_handle_lists_legacy",
+        "channels": "_handle_channels_legacy",
+        "mappings": "_handle_mappings_legacy",
+        "settings": "_handle_settings_legacy",
+        "admin": "_handle_admin_legacy",
+    }
+    
+    # Static menus are identical for every user, so build them once
+    _MAIN_MENU_TEXT = "<b>📋 Main Menu</b>\n\nChoose an option to manage your forwarding setup:"
+    _MAIN_MENU_MARKUP = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("📁 Folders", callback_data="folders_list"),
+            InlineKeyboardButton("📋 Lists", callback_data="lists_list")
+        ],
+        [
+            InlineKeyboardButton("📺 Channels", callback_data="channels_list"),
+            InlineKeyboardButton("🔗 Mappings", callback_data="mappings_list")
+        ],
+        [
+            InlineKeyboardButton("⚙️ Settings", callback_data="settings_main"),
+            InlineKeyboardButton("📊 Status", callback_data="status_system")
+        ]
+    ])
+    
+    _LISTS_TEXT = "<b>📋 Lists Management</b>\n\nManage your forwarding lists:"
+    _LISTS_MARKUP = InlineKeyboardMarkup([
+        [InlineKeyboardButton("📋 View Lists", callback_data="lists_view")],
+        [InlineKeyboardButton("➕ Create List", callback_data="lists_create")],
+        [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
+    ])
+    
+    _SETTINGS_TEXT = "<b>⚙️ Settings</b>\n\nConfigure your bot settings:"
+    _SETTINGS_MARKUP = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("🔧 General", callback_data="settings_general"),
+            InlineKeyboardButton("🚀 Performance", callback_data="settings_performance")
+        ],
+        [
+            InlineKeyboardButton("🔐 Security", callback_data="settings_security"),
+            InlineKeyboardButton("📝 Logging", callback_data="settings_logging")
+        ],
+        [
+            InlineKeyboardButton("💾 Backup", callback_data="settings_backup"),
+            InlineKeyboardButton("🔄 Reset", callback_data="settings_reset")
+        ],
+        [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
+    ])
+    
+    _ADMIN_TEXT = "<b>🔧 Admin Panel</b>\n\nSystem administration tools:"
+    _ADMIN_MARKUP = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("👥 Users", callback_data="admin_users"),
+            InlineKeyboardButton("📊 Stats", callback_data="admin_stats")
+        ],
+        [
+            InlineKeyboardButton("🔧 System", callback_data="admin_system"),
+            InlineKeyboardButton("📋 Logs", callback_data="admin_logs")
+        ],
+        [
+            InlineKeyboardButton("🗄️ Database", callback_data="admin_database"),
+            InlineKeyboardButton("🔄 Maintenance", callback_data="admin_maintenance")
+        ],
+        [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
+    ])
+    
+    # Shared by every error and fallback screen
+    _BACK_TO_MENU_MARKUP = InlineKeyboardMarkup([
+        [InlineKeyboardButton("🏠 Main Menu", callback_data="main_menu")]
+    ])
+    
+    # Fixed rows appended after the dynamic entries of list screens
+    _FOLDER_ACTION_ROWS = (
+        (InlineKeyboardButton("➕ Create Folder", callback_data="folders_create"),),
+        (InlineKeyboardButton("🔙 Back", callback_data="main_menu"),)
+    )
+    _FOLDERS_EMPTY_MARKUP = InlineKeyboardMarkup(_FOLDER_ACTION_ROWS)
+    _CHANNEL_ACTION_ROWS = (
+        (InlineKeyboardButton("➕ Add Channel", callback_data="channels_add"),),
+        (InlineKeyboardButton("🔍 Search Channels", callback_data="channels_search"),),
+        (InlineKeyboardButton("🔙 Back", callback_data="main_menu"),)
+    )
+    _MAPPING_ACTION_ROWS = (
+        (InlineKeyboardButton("➕ Create Mapping", callback_data="mappings_create"),),
+        (InlineKeyboardButton("📊 Statistics", callback_data="mappings_stats"),),
+        (InlineKeyboardButton("🔙 Back", callback_data="main_menu"),)
+    )
+    
+    # Seconds a list total is reused between page views
+    _COUNT_TTL = 30.0
+    
+    # Awaited input type -> processing method name
+    _INPUT_ROUTES = {
+        "channel_username": "_process_channel_input_legacy",
+        "folder_name": "_process_folder_input_legacy",
+        "list_name": "_process_list_input_legacy",
+    }
+    
     def __init__(self, client_factory: ClientFactory, forwarding_engine: ForwardingEngine):
         self.client_factory = client_factory
         self.forwarding_engine = forwarding_engine
         self.logger = logger.bind(component="legacy_migrator")
+        # Bound once here so the per-update log calls don't copy the context again
+        self._cb_log = self.logger.bind(op="callback")
+        self._msg_log = self.logger.bind(op="message")
+        
+        # Legacy state tracking (simplified version of old logic), in LRU order
+        # and bounded so abandoned flows can't grow it forever
+        self.user_states: "OrderedDict[int, LegacyUserState]" = OrderedDict()
+        
+        # List totals keyed by list name
+        self._count_cache: Dict[str, Tuple[float, int]] = {}
+        self._initialized = False
+    
+    def initialize(self) -> None:
+        """Initialize the legacy migrator; safe to call more than once."""
+        if self._initialized:
+            return
         
-        # Legacy state tracking (simplified version of old logic)
-        self.user_states: Dict[int, Dict[str, Any]] = {}
+        self.user_states.clear()
+        self._initialized = True
+        self.logger.info("Legacy migrator initialized")
     
-    async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    async def handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                    answered: bool = False) -> None:
         """
         Handle callback queries using legacy logic patterns.
         
         This method processes inline keyboard callbacks and routes them to
-        appropriate legacy handler functions.
+        appropriate legacy handler functions. Pass answered=True when the
+        caller has already acknowledged the query.
         """
         query = update.callback_query
         user = update.effective_user
@@ -49,44 +221,47 @@ class LegacyHandlerMigrator:
         if not query.data:
             return
         
+        # Stop the button spinner right away; the ack runs alongside the DB work
+        ack_task = None if answered else asyncio.create_task(query.answer())
+        
         try:
-            # Parse callback data (legacy format)
-            callback_parts = query.data.split('_')
-            action = callback_parts[0] if callback_parts else ""
+            # Parse callback data (legacy format); only the prefix selects the handler
+            action = query.data.partition('_')[0]
             
-            self.logger.info("Processing legacy callback", 
-                           action=action, 
-                           user_id=user.id,
-                           callback_data=query.data)
+            self._cb_log.info("Processing legacy callback", 
+                              action=action, 
+                              user_id=user.id,
+                              callback_data=query.data)
             
             # Route to appropriate legacy handler
-            if action == "main":
-                await self._handle_main_menu_legacy(update, context)
-            elif action == "folders":
-                await self._handle_folders_legacy(update, context)
-            elif action == "lists":
-                await self._handle_lists_legacy(update, context)
-            elif action == "channels":
-                await self._handle_channels_legacy(update, context)
-            elif action == "mappings":
-                await self._handle_mappings_legacy(update, context)
-            elif action == "settings":
-                await self._handle_settings_legacy(update, context)
-            elif action == "admin":
-                await self._handle_admin_legacy(update, context)
+            handler_name = self._ROUTES.get(action)
+            if handler_name:
+                await getattr(self, handler_name)(update, context)
             else:
                 # Unknown callback, provide fallback
-                await query.edit_message_text(
+                await self._edit_message(
+                    query,
                     "⚠️ This feature is being migrated to the new system. Please use /menu for available options.",
-                    reply_markup=self._get_back_to_menu_keyboard()
+                    self._get_back_to_menu_keyboard(),
+                    parse_mode=None
                 )
                 
+        except RetryAfter as e:
+            # Still rate limited after the limiter's retry; another edit would fail too
+            self._cb_log.warning("Legacy callback rate limited", retry_after=e.retry_after)
+        
         except Exception as e:
-            self.logger.error("Error in legacy callback handler", error=str(e), exc_info=e)
-            await query.edit_message_text(
+            self._cb_log.error("Error in legacy callback handler", error=str(e), exc_info=e)
+            await self._edit_message(
+                query,
                 "❌ An error occurred. Please try again or use /menu.",
-                reply_markup=self._get_back_to_menu_keyboard()
+                self._get_back_to_menu_keyboard(),
+                parse_mode=None
             )
+        
+        finally:
+            if ack_task:
+                await ack_task
     
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """
@@ -102,20 +277,21 @@ class LegacyHandlerMigrator:
             return
         
         try:
-            self.logger.info("Processing legacy message", 
-                           user_id=user.id, 
-                           message_length=len(message_text))
+            self._msg_log.info("Processing legacy message", 
+                               user_id=user.id, 
+                               message_length=len(message_text))
             
-            # Check if user has an active state
-            user_state = self.user_states.get(user.id, {})
+            # Check if user has an active state; most users don't, so test
+            # membership before paying for the TTL/LRU bookkeeping
+            user_state = self.get_user_state(user.id) if user.id in self.user_states else None
             
-            if user_state.get('awaiting_input'):
+            if user_state and user_state.awaiting_input:
                 await self._handle_user_input_legacy(update, context, user_state)
             else:
                 # No active state, check for commands or channel references
-                if message_text.startswith('/'):
+                if message_text[0] == '/':
                     await self._handle_command_legacy(update, context)
-                elif message_text.startswith('@') or message_text.startswith('https://t.me/'):
+                elif message_text.startswith(_CHANNEL_PREFIXES):
                     await self._handle_channel_reference_legacy(update, context)
                 else:
                     # General message, provide help
@@ -124,7 +300,7 @@ class LegacyHandlerMigrator:
                     )
                     
         except Exception as e:
-            self.logger.error("Error in legacy message handler", error=str(e), exc_info=e)
+            self._msg_log.error("Error in legacy message handler", error=str(e), exc_info=e)
             await update.message.reply_text(
                 "❌ An error occurred while processing your message. Please try again."
             )
@@ -133,46 +309,25 @@ class LegacyHandlerMigrator:
         """Handle main menu navigation (legacy style)."""
         query = update.callback_query
         
-        keyboard = [
-            [
-                InlineKeyboardButton("📁 Folders", callback_data="folders_list"),
-                InlineKeyboardButton("📋 Lists", callback_data="lists_list")
-            ],
-            [
-                InlineKeyboardButton("📺 Channels", callback_data="channels_list"),
-                InlineKeyboardButton("🔗 Mappings", callback_data="mappings_list")
-            ],
-            [
-                InlineKeyboardButton("⚙️ Settings", callback_data="settings_main"),
-                InlineKeyboardButton("📊 Status", callback_data="status_system")
-            ]
-        ]
-        
-        await query.edit_message_text(
-            "📋 **Main Menu**\n\nChoose an option to manage your forwarding setup:",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+        await self._edit_message(
+            query,
+            self._MAIN_MENU_TEXT,
+            self._MAIN_MENU_MARKUP
         )
     
     async def _handle_folders_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle folder management (legacy style)."""
         query = update.callback_query
         
-        # Get user's folders from database
-        async with get_session() as session:
-            # TODO: Implement folder listing from new database schema
-            folders = []  # Placeholder
+        # TODO: Implement folder listing from new database schema; until then
+        # there is nothing to query, so don't check out a connection
+        folders = []  # Placeholder
         
         if not folders:
-            keyboard = [
-                [InlineKeyboardButton("➕ Create Folder", callback_data="folders_create")],
-                [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
-            ]
-            
-            await query.edit_message_text(
-                "📁 **Folders**\n\nNo folders found. Create your first folder to organize your forwarding lists.",
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode='Markdown'
+            await self._edit_message(
+                query,
+                "<b>📁 Folders</b>\n\nNo folders found. Create your first folder to organize your forwarding lists.",
+                self._FOLDERS_EMPTY_MARKUP
             )
         else:
             # Show existing folders
@@ -182,41 +337,35 @@ class LegacyHandlerMigrator:
                     InlineKeyboardButton(f"📁 {folder.name}", callback_data=f"folders_view_{folder.id}")
                 ])
             
-            keyboard.extend([
-                [InlineKeyboardButton("➕ Create Folder", callback_data="folders_create")],
-                [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
-            ])
+            keyboard.extend(self._FOLDER_ACTION_ROWS)
             
-            await query.edit_message_text(
-                f"📁 **Folders** ({len(folders)})\n\nSelect a folder to manage:",
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode='Markdown'
+            await self._edit_message(
+                query,
+                f"<b>📁 Folders</b> ({len(folders)})\n\nSelect a folder to manage:",
+                InlineKeyboardMarkup(keyboard)
             )
     
     async def _handle_lists_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle list management (legacy style)."""
         query = update.callback_query
         
-        keyboard = [
-            [InlineKeyboardButton("📋 View Lists", callback_data="lists_view")],
-            [InlineKeyboardButton("➕ Create List", callback_data="lists_create")],
-            [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
-        ]
-        
-        await query.edit_message_text(
-            "📋 **Lists Management**\n\nManage your forwarding lists:",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+        await self._edit_message(
+            query,
+            self._LISTS_TEXT,
+            self._LISTS_MARKUP
         )
     
     async def _handle_channels_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle channel management (legacy style)."""
         query = update.callback_query
+        page = self._list_page(query.data, "channels_list")
         
-        # Get channels from database
-        async with get_session() as session:
-            from sqlalchemy import select
-            result = await session.execute(select(Channel).limit(10))
+        # Get one page of channels plus the overall total
+        async with db_manager.get_session() as session:
+            total = await self._cached_count(session, "channels", select(func.count(Channel.id)))
+            result = await session.execute(
+                select(Channel).order_by(Channel.id).limit(PAGE_SIZE).offset(page * PAGE_SIZE)
+            )
             channels = result.scalars().all()
         
         keyboard = []
@@ -231,42 +380,50 @@ class LegacyHandlerMigrator:
                     )
                 ])
         
-        keyboard.extend([
-            [InlineKeyboardButton("➕ Add Channel", callback_data="channels_add")],
-            [InlineKeyboardButton("🔍 Search Channels", callback_data="channels_search")],
-            [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
-        ])
+        nav_row = self._page_nav_row("channels_list", page, total)
+        if nav_row:
+            keyboard.append(nav_row)
+        keyboard.extend(self._CHANNEL_ACTION_ROWS)
         
-        channel_count = len(channels)
-        await query.edit_message_text(
-            f"📺 **Channels** ({channel_count})\n\nManage your source and destination channels:",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+        await self._edit_message(
+            query,
+            f"<b>📺 Channels</b> ({total})\n\nManage your source and destination channels:",
+            InlineKeyboardMarkup(keyboard)
         )
     
     async def _handle_mappings_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle mapping management (legacy style)."""
         query = update.callback_query
+        page = self._list_page(query.data, "mappings_list")
         
-        # Get mappings from database
-        async with get_session() as session:
-            from sqlalchemy import select
-            from sqlalchemy.orm import selectinload
+        # Get one page of mappings plus the overall total
+        async with db_manager.get_session() as session:
+            total = await self._cached_count(session, "mappings", select(func.count(ForwardingMapping.id)))
+            # Plain rows with just the rendered columns; no ORM objects to hydrate
             result = await session.execute(
-                select(ForwardingMapping)
-                .options(selectinload(ForwardingMapping.source_channel))
-                .options(selectinload(ForwardingMapping.destination_channel))
-                .limit(10)
+                select(
+                    ForwardingMapping.id,
+                    ForwardingMapping.enabled,
+                    _SourceChannel.title.label('source_title'),
+                    _SourceChannel.telegram_id.label('source_telegram_id'),
+                    _DestChannel.title.label('dest_title'),
+                    _DestChannel.telegram_id.label('dest_telegram_id')
+                )
+                .join(_SourceChannel, ForwardingMapping.source_channel_id == _SourceChannel.id)
+                .join(_DestChannel, ForwardingMapping.dest_channel_id == _DestChannel.id)
+                .order_by(ForwardingMapping.id)
+                .limit(PAGE_SIZE)
+                .offset(page * PAGE_SIZE)
             )
-            mappings = result.scalars().all()
+            mappings = result.all()
         
         keyboard = []
         
         if mappings:
             for mapping in mappings:
                 status_emoji = "✅" if mapping.enabled else "❌"
-                source_name = mapping.source_channel.title or f"ID: {mapping.source_channel.telegram_id}"
-                dest_name = mapping.destination_channel.title or f"ID: {mapping.destination_channel.telegram_id}"
+                source_name = mapping.source_title or f"ID: {mapping.source_telegram_id}"
+                dest_name = mapping.dest_title or f"ID: {mapping.dest_telegram_id}"
                 
                 keyboard.append([
                     InlineKeyboardButton(
@@ -275,84 +432,46 @@ class LegacyHandlerMigrator:
                     )
                 ])
         
-        keyboard.extend([
-            [InlineKeyboardButton("➕ Create Mapping", callback_data="mappings_create")],
-            [InlineKeyboardButton("📊 Statistics", callback_data="mappings_stats")],
-            [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
-        ])
+        nav_row = self._page_nav_row("mappings_list", page, total)
+        if nav_row:
+            keyboard.append(nav_row)
+        keyboard.extend(self._MAPPING_ACTION_ROWS)
         
-        mapping_count = len(mappings)
-        await query.edit_message_text(
-            f"🔗 **Forwarding Mappings** ({mapping_count})\n\nManage your forwarding rules:",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+        await self._edit_message(
+            query,
+            f"<b>🔗 Forwarding Mappings</b> ({total})\n\nManage your forwarding rules:",
+            InlineKeyboardMarkup(keyboard)
         )
     
     async def _handle_settings_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle settings management (legacy style)."""
         query = update.callback_query
         
-        keyboard = [
-            [
-                InlineKeyboardButton("🔧 General", callback_data="settings_general"),
-                InlineKeyboardButton("🚀 Performance", callback_data="settings_performance")
-            ],
-            [
-                InlineKeyboardButton("🔐 Security", callback_data="settings_security"),
-                InlineKeyboardButton("📝 Logging", callback_data="settings_logging")
-            ],
-            [
-                InlineKeyboardButton("💾 Backup", callback_data="settings_backup"),
-                InlineKeyboardButton("🔄 Reset", callback_data="settings_reset")
-            ],
-            [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
-        ]
-        
-        await query.edit_message_text(
-            "⚙️ **Settings**\n\nConfigure your bot settings:",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+        await self._edit_message(
+            query,
+            self._SETTINGS_TEXT,
+            self._SETTINGS_MARKUP
         )
     
     async def _handle_admin_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle admin panel (legacy style)."""
         query = update.callback_query
         
-        keyboard = [
-            [
-                InlineKeyboardButton("👥 Users", callback_data="admin_users"),
-                InlineKeyboardButton("📊 Stats", callback_data="admin_stats")
-            ],
-            [
-                InlineKeyboardButton("🔧 System", callback_data="admin_system"),
-                InlineKeyboardButton("📋 Logs", callback_data="admin_logs")
-            ],
-            [
-                InlineKeyboardButton("🗄️ Database", callback_data="admin_database"),
-                InlineKeyboardButton("🔄 Maintenance", callback_data="admin_maintenance")
-            ],
-            [InlineKeyboardButton("🔙 Back", callback_data="main_menu")]
-        ]
-        
-        await query.edit_message_text(
-            "🔧 **Admin Panel**\n\nSystem administration tools:",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode='Markdown'
+        await self._edit_message(
+            query,
+            self._ADMIN_TEXT,
+            self._ADMIN_MARKUP
         )
     
-    async def _handle_user_input_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_state: Dict[str, Any]) -> None:
+    async def _handle_user_input_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_state: LegacyUserState) -> None:
         """Handle user input based on legacy state patterns."""
         user = update.effective_user
         message_text = update.message.text
         
-        input_type = user_state.get('input_type')
+        handler_name = self._INPUT_ROUTES.get(user_state.input_type)
         
-        if input_type == 'channel_username':
-            await self._process_channel_input_legacy(update, context, message_text)
-        elif input_type == 'folder_name':
-            await self._process_folder_input_legacy(update, context, message_text)
-        elif input_type == 'list_name':
-            await self._process_list_input_legacy(update, context, message_text)
+        if handler_name:
+            await getattr(self, handler_name)(update, context, message_text)
         else:
             # Unknown input type, clear state
             self.user_states.pop(user.id, None)
@@ -368,23 +487,21 @@ class LegacyHandlerMigrator:
         self.user_states.pop(user.id, None)
         
         # Basic validation
-        if not (channel_input.startswith('@') or channel_input.startswith('https://t.me/')):
+        if not channel_input.startswith(_CHANNEL_PREFIXES):
             await update.message.reply_text(
                 "❌ Invalid channel format. Please provide a channel username (@channel) or URL (https://t.me/channel)."
             )
             return
         
         # Extract channel identifier
-        if channel_input.startswith('https://t.me/'):
-            channel_username = channel_input.split('/')[-1]
-        else:
+        if channel_input[0] == '@':
             channel_username = channel_input.lstrip('@')
+        else:
+            channel_username = channel_input.rpartition('/')[2]
         
         await update.message.reply_text(
-            f"📺 Channel `{channel_username}` will be processed.\n\n"
-            "⚠️ **Note**: Channel processing is being migrated to the new system. "
-            "Full functionality will be available soon.",
-            parse_mode='Markdown'
+            _CHANNEL_TEMPLATE.format(name=escape_markdown(channel_username, version=2, entity_type='code')),
+            parse_mode=ParseMode.MARKDOWN_V2
         )
     
     async def _process_folder_input_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE, folder_name: str) -> None:
@@ -394,17 +511,15 @@ class LegacyHandlerMigrator:
         # Clear user state
         self.user_states.pop(user.id, None)
         
-        if len(folder_name) < 1 or len(folder_name) > 50:
+        if not 1 <= len(folder_name) <= 50:
             await update.message.reply_text(
                 "❌ Folder name must be between 1 and 50 characters."
             )
             return
         
         await update.message.reply_text(
-            f"📁 Folder `{folder_name}` will be created.\n\n"
-            "⚠️ **Note**: Folder management is being migrated to the new system. "
-            "Full functionality will be available soon.",
-            parse_mode='Markdown'
+            _FOLDER_TEMPLATE.format(name=escape_markdown(folder_name, version=2, entity_type='code')),
+            parse_mode=ParseMode.MARKDOWN_V2
         )
     
     async def _process_list_input_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE, list_name: str) -> None:
@@ -414,24 +529,24 @@ class LegacyHandlerMigrator:
         # Clear user state
         self.user_states.pop(user.id, None)
         
-        if len(list_name) < 1 or len(list_name) > 50:
+        if not 1 <= len(list_name) <= 50:
             await update.message.reply_text(
                 "❌ List name must be between 1 and 50 characters."
             )
             return
         
         await update.message.reply_text(
-            f"📋 List `{list_name}` will be created.\n\n"
-            "⚠️ **Note**: List management is being migrated to the new system. "
-            "Full functionality will be available soon.",
-            parse_mode='Markdown'
+            _LIST_TEMPLATE.format(name=escape_markdown(list_name, version=2, entity_type='code')),
+            parse_mode=ParseMode.MARKDOWN_V2
         )
     
     async def _handle_command_legacy(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle legacy commands that might not be registered."""
         message_text = update.message.text.lower()
         
-        if message_text in ['/folders', '/lists', '/channels', '/mappings']:
+        # '/folders@SomeBot' is the same command as '/folders'
+        command = message_text.partition('@')[0]
+        if command in _MIGRATED_COMMANDS:
             await update.message.reply_text(
                 f"ℹ️ The command `{message_text}` is being migrated. Please use /menu to access these features."
             )
@@ -451,24 +566,70 @@ class LegacyHandlerMigrator:
             parse_mode='Markdown'
         )
     
+    async def _cached_count(self, session, key: str, stmt) -> int:
+        """Run a COUNT query, reusing a recent result for the same list."""
+        cached = self._count_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self._COUNT_TTL:
+            return cached[1]
+        
+        total = await session.scalar(stmt) or 0
+        self._count_cache[key] = (time.monotonic(), total)
+        return total
+    
+    @staticmethod
+    def _list_page(data: str, list_prefix: str) -> int:
+        """Get the page number from '<list_prefix>_<page>' callback data, defaulting to 0."""
+        if not data.startswith(list_prefix + '_'):
+            return 0
+        tail = data[len(list_prefix) + 1:]
+        return int(tail) if tail.isdigit() else 0
+    
+    @staticmethod
+    def _page_nav_row(list_prefix: str, page: int, total: int) -> List[InlineKeyboardButton]:
+        """Build Prev/Next buttons for a paged legacy list."""
+        row = []
+        if page > 0:
+            row.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"{list_prefix}_{page - 1}"))
+        if (page + 1) * PAGE_SIZE < total:
+            row.append(InlineKeyboardButton("➡️ Next", callback_data=f"{list_prefix}_{page + 1}"))
+        return row
+    
+    async def _edit_message(self, query, text: str, reply_markup: InlineKeyboardMarkup,
+                            parse_mode: Optional[str] = ParseMode.HTML) -> None:
+        """Edit the callback's message, ignoring repeated presses on an unchanged screen."""
+        try:
+            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        except BadRequest as e:
+            # Telegram rejects edits that leave the message as it is
+            if "message is not modified" not in str(e).lower():
+                raise
+    
     def _get_back_to_menu_keyboard(self) -> InlineKeyboardMarkup:
         """Get a simple back to menu keyboard."""
-        return InlineKeyboardMarkup([
-            [InlineKeyboardButton("🏠 Main Menu", callback_data="main_menu")]
-        ])
+        return self._BACK_TO_MENU_MARKUP
     
     def set_user_state(self, user_id: int, input_type: str, **kwargs) -> None:
         """Set user state for input processing."""
-        self.user_states[user_id] = {
-            'awaiting_input': True,
-            'input_type': input_type,
-            **kwargs
-        }
+        self.user_states[user_id] = LegacyUserState(input_type=input_type, extra=kwargs)
+        self.user_states.move_to_end(user_id)
+        
+        # Drop the least recently used states beyond the cap
+        while len(self.user_states) > MAX_USER_STATES:
+            self.user_states.popitem(last=False)
     
     def clear_user_state(self, user_id: int) -> None:
         """Clear user state."""
         self.user_states.pop(user_id, None)
     
-    def get_user_state(self, user_id: int) -> Optional[Dict[str, Any]]:
-        """Get current user state."""
-        return self.user_states.get(user_id)
+    def get_user_state(self, user_id: int) -> Optional[LegacyUserState]:
+        """Get current user state, or None if there is none or it expired."""
+        state = self.user_states.get(user_id)
+        if state is None:
+            return None
+        
+        if time.monotonic() - state.created_at > USER_STATE_TTL:
+            del self.user_states[user_id]
+            return None
+        
+        self.user_states.move_to_end(user_id)
+        return state
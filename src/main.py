@@ -4,19 +4,31 @@ Integrates dual-client architecture with forwarding engine and queue management.
 """
 import asyncio
 import logging
+import logging.handlers
+import queue
 import signal
 import sys
 from contextlib import asynccontextmanager
 from typing import Optional
 
 import structlog
-import uvloop
 from src.config import settings
 from src.database import init_database, close_database
 from src.clients import ClientFactory, get_client_factory
 from src.core import ForwardingEngine
 from src.handlers import HandlerRegistry
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """Serialize a log event with orjson, returning str for stdlib handlers."""
+    return orjson.dumps(obj, default=kwargs.get('default')).decode()
+
+
 # Configure structured logging
 structlog.configure(
     processors=[
@@ -28,7 +40,7 @@ structlog.configure(
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps) if orjson else structlog.processors.JSONRenderer()
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -112,6 +124,10 @@ class TelegramForwardingBot:
         self._running = False
         
         try:
+            # Write pending handler state before the database goes away
+            if self.handler_registry:
+                await self.handler_registry.shutdown()
+            
             # Stop forwarding engine
             if self.forwarding_engine:
                 await self.forwarding_engine.stop()
@@ -133,6 +149,7 @@ class TelegramForwardingBot:
     
     async def run(self) -> None:
         """Run the bot until shutdown signal."""
+        self._setup_signal_handlers()
         await self.initialize()
         await self.start()
         
@@ -157,13 +174,20 @@ class TelegramForwardingBot:
             logger.warning("Failed to get system status", error=str(e))
     
     def _setup_signal_handlers(self) -> None:
-        """Setup signal handlers for graceful shutdown."""
-        def signal_handler(signum, frame):
+        """Setup signal handlers for graceful shutdown; must run inside the event loop."""
+        loop = asyncio.get_running_loop()
+        
+        def on_signal(signum: int) -> None:
             logger.info(f"Received signal {signum}, initiating shutdown...")
             self._shutdown_event.set()
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                # Runs the callback on the loop itself, so setting the event is safe
+                loop.add_signal_handler(signum, on_signal, signum)
+            except NotImplementedError:
+                # Windows: fall back to a plain handler that hops onto the loop
+                signal.signal(signum, lambda sig, frame: loop.call_soon_threadsafe(on_signal, sig))
     
     @property
     def is_running(self) -> bool:
@@ -173,23 +197,24 @@ class TelegramForwardingBot:
 
 async def main():
     """Main application entry point."""
-    # Use uvloop for better performance on Unix systems
-    if sys.platform != 'win32':
-        uvloop.install()
-    
-    # Configure logging
+    # Configure logging. Records are formatted on the loop thread and handed to a
+    # listener thread, so console and file writes never block the event loop.
+    log_queue = queue.SimpleQueue()
     logging.basicConfig(
         level=getattr(logging, settings.log_level),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('bot.log', encoding='utf-8')
-        ]
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    log_listener = logging.handlers.QueueListener(
+        log_queue,
+        logging.StreamHandler(),
+        logging.FileHandler('bot.log', encoding='utf-8'),
+        respect_handler_level=True
     )
+    log_listener.start()
     
     # Create and run bot
     bot = TelegramForwardingBot()
-    bot._setup_signal_handlers()
     
     try:
         await bot.run()
@@ -198,7 +223,19 @@ async def main():
     except Exception as e:
         logger.error("Unexpected error in main", error=str(e), exc_info=True)
         sys.exit(1)
+    finally:
+        # Flush whatever is still queued
+        log_listener.stop()
 
 
 if __name__ == "__main__":
+    # Use uvloop for better performance on Unix systems. It has to be installed
+    # before asyncio.run() creates the loop; inside main() it was too late.
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+    
     asyncio.run(main())
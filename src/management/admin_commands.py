@@ -1,13 +1,20 @@
 """
 Administrative commands for system management and maintenance.
 """
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 
-from sqlalchemy import select, func, delete, update
+from sqlalchemy import (
+    select, func, delete, update, text, tuple_, case, cast, table, column, literal_column,
+    bindparam, lambda_stmt, BigInteger, Boolean, String
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB
+from sqlalchemy.exc import IntegrityError
 from src.database import (
-    get_db_session, init_database, close_database,
+    get_db_session, init_database,
     User, Channel, ForwardingMapping, MessageLog, DeduplicationCache,
     AccessType, ForwardingMode, MessageStatus, UserRole
 )
@@ -15,50 +22,205 @@ from src.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Tables estimated below this many rows are counted exactly instead
+EXACT_COUNT_THRESHOLD = 1000
+
+# Rows removed per committed DELETE in cleanup jobs
+CLEANUP_BATCH_SIZE = 10_000
+
+# Failed messages requeued per committed UPDATE
+RESET_BATCH_SIZE = 5000
+
+_ESTIMATE_ROWS = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table")
+_PG_CLASS = table('pg_class', column('relname'), column('reltuples'))
+
+# Fixed-shape channel statements, built once and cached by lambda_stmt
+_ADMIN_ID_STMT = lambda_stmt(
+    lambda: select(User.id).where(User.role == UserRole.ADMINISTRATOR).limit(1),
+    enable_tracking=False
+)
+_REMOVE_CHANNEL_STMT = lambda_stmt(
+    lambda: delete(Channel).where(Channel.telegram_id == bindparam('channel_tid')).returning(Channel.id),
+    enable_tracking=False
+)
+_TOGGLE_CHANNEL_STMT = lambda_stmt(
+    lambda: update(Channel)
+    .where(Channel.telegram_id == bindparam('channel_tid'))
+    .values(is_active=bindparam('active'))
+    .returning(Channel.id),
+    enable_tracking=False
+)
+
+
+def _build_create_mapping_stmt():
+    """Resolve both channels and insert the mapping in one statement.
+    
+    Returns source_channel_id / dest_channel_id (NULL when that channel is
+    missing) and mapping_id (NULL when nothing was inserted).
+    """
+    source = select(Channel.id).where(Channel.telegram_id == bindparam('source_tid')).cte('source')
+    dest = select(Channel.id).where(Channel.telegram_id == bindparam('dest_tid')).cte('dest')
+    inserted = (
+        pg_insert(ForwardingMapping)
+        .from_select(
+            ['source_channel_id', 'dest_channel_id', 'mode', 'enabled'],
+            select(
+                source.c.id,
+                dest.c.id,
+                bindparam('mode', type_=ForwardingMapping.__table__.c.mode.type),
+                bindparam('enabled', type_=Boolean)
+            )
+        )
+        .on_conflict_do_nothing(constraint='unique_mapping')
+        .returning(ForwardingMapping.id)
+        .cte('inserted')
+    )
+    return select(
+        select(source.c.id).scalar_subquery().label('source_channel_id'),
+        select(dest.c.id).scalar_subquery().label('dest_channel_id'),
+        select(inserted.c.id).scalar_subquery().label('mapping_id')
+    )
+
+
+_CREATE_MAPPING_STMT = _build_create_mapping_stmt()
+
+
+# Columns returned for each listed user; updated_at doubles as last activity,
+# since the handler registry bumps it when it records a user as seen
+_USER_COLUMNS = (User.id, User.telegram_id, User.role, User.created_at, User.updated_at)
+
+
+def _user_row_dict(user) -> Dict[str, Any]:
+    """Convert a user column row into its output dict."""
+    return {
+        'id': user.id,
+        'telegram_id': user.telegram_id,
+        'role': user.role.value,
+        'created_at': user.created_at.isoformat(),
+        'last_seen': user.updated_at.isoformat() if user.updated_at else None
+    }
+
+
+def _count(column, *where):
+    """Scalar subquery counting rows, for stats fetched in one statement."""
+    return select(func.count(column)).where(*where).scalar_subquery()
+
+
+def approx_row_count(model):
+    """Scalar expression for a table's planner row estimate, counted exactly when small.
+    
+    The estimate is O(1); CASE only runs the COUNT(*) subquery for tables
+    under EXACT_COUNT_THRESHOLD rows, or ones never analyzed (reltuples -1).
+    """
+    estimate = func.coalesce(
+        select(cast(_PG_CLASS.c.reltuples, BigInteger))
+        .where(_PG_CLASS.c.relname == model.__tablename__)
+        .scalar_subquery(),
+        -1
+    )
+    return case((estimate < EXACT_COUNT_THRESHOLD, _count(model.id)), else_=estimate)
+
+
+async def _estimated_count(session, table: str, exact_stmt) -> Tuple[int, bool]:
+    """Planner row estimate for a table, or exact_stmt's count when the table is small.
+    
+    Returns (count, is_estimate).
+    """
+    estimate = await session.scalar(_ESTIMATE_ROWS, {'table': table})
+    if estimate is None or estimate < EXACT_COUNT_THRESHOLD:
+        return await session.scalar(exact_stmt), False
+    return estimate, True
+
+
+async def _delete_in_batches(session, model, *where) -> int:
+    """Delete matching rows in id-ordered batches, committing each one.
+    
+    Keeps every transaction short so large purges don't hold locks or
+    block autovacuum for the whole run.
+    """
+    total = 0
+    while True:
+        batch_ids = select(model.id).where(*where).order_by(model.id).limit(CLEANUP_BATCH_SIZE)
+        result = await session.execute(delete(model).where(model.id.in_(batch_ids)))
+        await session.commit()
+        total += result.rowcount
+        if result.rowcount < CLEANUP_BATCH_SIZE:
+            return total
+
+
+def _grouped_counts(column, *where):
+    """Scalar subquery aggregating per-value row counts of an enum column into a JSON object.
+    
+    The grouped rows never reach Python: keys are mapped from the stored enum
+    names to their values in SQL, and an empty group set comes back as {}.
+    """
+    enum_values = {member.name: member.value for member in column.type.enum_class}
+    key = case(enum_values, value=cast(column, String))
+    grouped = select(key.label('key'), func.count().label('n')).where(*where).group_by(column).subquery()
+    return select(
+        func.coalesce(func.jsonb_object_agg(grouped.c.key, grouped.c.n), cast({}, JSONB), type_=JSONB)
+    ).scalar_subquery()
+
 
 class AdminCommands:
     """Administrative commands for system management."""
     
-    async def create_admin_user(self, telegram_id: int, username: Optional[str] = None) -> Dict[str, Any]:
+    # Seconds a successful system stats result is shared between callers
+    _STATS_TTL = 10.0
+    
+    def __init__(self):
+        # Administrator credited with added channels; looked up once, reset on role changes
+        self._admin_id: Optional[int] = None
+        
+        # Last system stats result; the lock makes concurrent callers share one query
+        self._stats: Optional[Dict[str, Any]] = None
+        self._stats_at = 0.0
+        self._stats_lock = asyncio.Lock()
+    
+    def invalidate_stats(self) -> None:
+        """Drop the cached system stats so the next request reads the database."""
+        self._stats = None
+    
+    async def create_admin_user(self, telegram_id: int) -> Dict[str, Any]:
         """Create a new administrator user."""
         try:
             await init_database()
             
             async with get_db_session() as session:
-                # Check if user already exists
+                # One upsert: insert, or promote an existing non-admin. An existing
+                # administrator matches neither branch and returns no row; xmax is
+                # 0 only for freshly inserted rows
                 result = await session.execute(
-                    select(User).where(User.telegram_id == telegram_id)
+                    pg_insert(User)
+                    .values(telegram_id=telegram_id, role=UserRole.ADMINISTRATOR)
+                    .on_conflict_do_update(
+                        index_elements=[User.telegram_id],
+                        set_={'role': UserRole.ADMINISTRATOR},
+                        where=User.role != UserRole.ADMINISTRATOR
+                    )
+                    .returning(User.id, literal_column('xmax = 0').label('inserted'))
                 )
-                existing_user = result.scalar_one_or_none()
+                row = result.one_or_none()
                 
-                if existing_user:
-                    if existing_user.role == UserRole.ADMINISTRATOR:
-                        return {
-                            'success': False,
-                            'message': f'User {telegram_id} is already an administrator'
-                        }
-                    else:
-                        # Upgrade existing user to admin
-                        existing_user.role = UserRole.ADMINISTRATOR
-                        await session.commit()
-                        return {
-                            'success': True,
-                            'message': f'User {telegram_id} upgraded to administrator'
-                        }
-                else:
-                    # Create new admin user
-                    admin_user = User(
-                        telegram_id=telegram_id,
-                        username=username,
-                        role=UserRole.ADMINISTRATOR
-                    )
-                    session.add(admin_user)
-                    await session.commit()
-                    
+                if row is None:
+                    return {
+                        'success': False,
+                        'message': f'User {telegram_id} is already an administrator'
+                    }
+                
+                await session.commit()
+                self._admin_id = None
+                self.invalidate_stats()
+                
+                if row.inserted:
                     return {
                         'success': True,
                         'message': f'Administrator user {telegram_id} created successfully'
                     }
+                return {
+                    'success': True,
+                    'message': f'User {telegram_id} upgraded to administrator'
+                }
                     
         except Exception as e:
             logger.error(f"Failed to create admin user: {e}", exc_info=True)
@@ -66,37 +228,51 @@ class AdminCommands:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            await close_database()
     
-    async def list_users(self, role_filter: Optional[UserRole] = None) -> Dict[str, Any]:
-        """List all users, optionally filtered by role."""
+    async def list_users(self, role_filter: Optional[UserRole] = None,
+                         after_created_at: Optional[datetime] = None,
+                         after_id: Optional[int] = None,
+                         limit: int = 100) -> Dict[str, Any]:
+        """List users newest first, one keyset page at a time, optionally filtered by role.
+        
+        Pass the previous page's next_cursor as (after_created_at, after_id)
+        to continue; next_cursor is None on the last page.
+        """
         try:
             await init_database()
             
-            async with get_db_session() as session:
-                query = select(User)
+            # The page and the total are independent, so fetch them concurrently
+            # on two pooled connections instead of back to back on one
+            async with get_db_session() as session, get_db_session() as count_session:
+                # Plain column rows; no ORM objects to instantiate and track
+                query = select(*_USER_COLUMNS)
+                count_query = select(func.count(User.id))
                 if role_filter:
                     query = query.where(User.role == role_filter)
+                    count_query = count_query.where(User.role == role_filter)
+                if after_created_at is not None and after_id is not None:
+                    query = query.where(tuple_(User.created_at, User.id) < tuple_(after_created_at, after_id))
+                
+                # Large tables report the planner estimate (of all users) rather than scanning
+                result, (total_count, total_is_estimate) = await asyncio.gather(
+                    session.execute(query.order_by(User.created_at.desc(), User.id.desc()).limit(limit)),
+                    _estimated_count(count_session, User.__tablename__, count_query)
+                )
+                users = result.all()
                 
-                result = await session.execute(query.order_by(User.created_at.desc()))
-                users = result.scalars().all()
+                user_list = [_user_row_dict(user) for user in users]
                 
-                user_list = []
-                for user in users:
-                    user_list.append({
-                        'id': user.id,
-                        'telegram_id': user.telegram_id,
-                        'username': user.username,
-                        'role': user.role.value,
-                        'created_at': user.created_at.isoformat(),
-                        'last_seen': user.last_seen.isoformat() if user.last_seen else None
-                    })
+                # A full page may have more behind it
+                next_cursor = None
+                if len(users) == limit:
+                    next_cursor = (users[-1].created_at.isoformat(), users[-1].id)
                 
                 return {
                     'success': True,
                     'users': user_list,
-                    'total_count': len(user_list)
+                    'next_cursor': next_cursor,
+                    'total_count': total_count,
+                    'total_is_estimate': total_is_estimate
                 }
                 
         except Exception as e:
@@ -105,8 +281,26 @@ class AdminCommands:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            await close_database()
+    
+    async def iter_users(self, role_filter: Optional[UserRole] = None,
+                         chunk_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every user newest first, streamed from the server chunk_size rows at a time.
+        
+        Unlike list_users this covers the whole table in constant memory;
+        database errors propagate to the caller.
+        """
+        await init_database()
+        
+        query = select(*_USER_COLUMNS)
+        if role_filter:
+            query = query.where(User.role == role_filter)
+        query = query.order_by(User.created_at.desc(), User.id.desc()).execution_options(yield_per=chunk_size)
+        
+        async with get_db_session() as session:
+            result = await session.stream(query)
+            async for partition in result.partitions():
+                for user in partition:
+                    yield _user_row_dict(user)
     
     async def manage_channel(self, action: str, telegram_id: int, **kwargs) -> Dict[str, Any]:
         """Manage channel operations (add, remove, update, activate, deactivate)."""
@@ -115,20 +309,24 @@ class AdminCommands:
             
             async with get_db_session() as session:
                 if action == "add":
-                    return await self._add_channel(session, telegram_id, **kwargs)
+                    result = await self._add_channel(session, telegram_id, **kwargs)
                 elif action == "remove":
-                    return await self._remove_channel(session, telegram_id)
+                    result = await self._remove_channel(session, telegram_id)
                 elif action == "update":
-                    return await self._update_channel(session, telegram_id, **kwargs)
+                    result = await self._update_channel(session, telegram_id, **kwargs)
                 elif action == "activate":
-                    return await self._toggle_channel(session, telegram_id, True)
+                    result = await self._toggle_channel(session, telegram_id, True)
                 elif action == "deactivate":
-                    return await self._toggle_channel(session, telegram_id, False)
+                    result = await self._toggle_channel(session, telegram_id, False)
                 else:
                     return {
                         'success': False,
                         'error': f'Unknown action: {action}'
                     }
+                
+                if result['success']:
+                    self.invalidate_stats()
+                return result
                     
         except Exception as e:
             logger.error(f"Failed to manage channel: {e}", exc_info=True)
@@ -136,38 +334,34 @@ class AdminCommands:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            await close_database()
     
     async def _add_channel(self, session, telegram_id: int, **kwargs) -> Dict[str, Any]:
         """Add a new channel."""
-        # Check if channel already exists
+        # Get admin user for added_by_user_id
+        if self._admin_id is None:
+            admin_result = await session.execute(_ADMIN_ID_STMT)
+            self._admin_id = admin_result.scalar_one()
+        
+        # Insert unless the channel already exists; a conflict returns no row
         result = await session.execute(
-            select(Channel).where(Channel.telegram_id == telegram_id)
+            pg_insert(Channel)
+            .values(
+                telegram_id=telegram_id,
+                title=kwargs.get('title') or f'Channel {telegram_id}',
+                access_type=AccessType(kwargs.get('access_type', 'user')),
+                added_by_user_id=self._admin_id,
+                metadata=kwargs.get('metadata', {})
+            )
+            .on_conflict_do_nothing(index_elements=[Channel.telegram_id])
+            .returning(Channel.id)
         )
-        existing_channel = result.scalar_one_or_none()
         
-        if existing_channel:
+        if result.scalar_one_or_none() is None:
             return {
                 'success': False,
                 'message': f'Channel {telegram_id} already exists'
             }
         
-        # Get admin user for added_by_user_id
-        admin_result = await session.execute(
-            select(User).where(User.role == UserRole.ADMINISTRATOR).limit(1)
-        )
-        admin_user = admin_result.scalar_one()
-        
-        channel = Channel(
-            telegram_id=telegram_id,
-            title=kwargs.get('title', f'Channel {telegram_id}'),
-            access_type=AccessType(kwargs.get('access_type', 'user')),
-            added_by_user_id=admin_user.id,
-            metadata=kwargs.get('metadata', {})
-        )
-        
-        session.add(channel)
         await session.commit()
         
         return {
@@ -177,27 +371,23 @@ class AdminCommands:
     
     async def _remove_channel(self, session, telegram_id: int) -> Dict[str, Any]:
         """Remove a channel and its mappings."""
-        result = await session.execute(
-            select(Channel).where(Channel.telegram_id == telegram_id)
-        )
-        channel = result.scalar_one_or_none()
+        # Mappings are removed by the ON DELETE CASCADE on their channel keys;
+        # message logs are kept as history, so a channel with logs stays
+        try:
+            result = await session.execute(_REMOVE_CHANNEL_STMT, {'channel_tid': telegram_id})
+        except IntegrityError:
+            await session.rollback()
+            return {
+                'success': False,
+                'message': f'Channel {telegram_id} has message history and cannot be removed; deactivate it instead'
+            }
         
-        if not channel:
+        if result.scalar_one_or_none() is None:
             return {
                 'success': False,
                 'message': f'Channel {telegram_id} not found'
             }
         
-        # Remove associated mappings
-        await session.execute(
-            delete(ForwardingMapping).where(
-                (ForwardingMapping.source_channel_id == channel.id) |
-                (ForwardingMapping.dest_channel_id == channel.id)
-            )
-        )
-        
-        # Remove the channel
-        await session.delete(channel)
         await session.commit()
         
         return {
@@ -207,25 +397,26 @@ class AdminCommands:
     
     async def _update_channel(self, session, telegram_id: int, **kwargs) -> Dict[str, Any]:
         """Update channel properties."""
+        # Update allowed fields
+        values = {'updated_at': func.now()}
+        if 'title' in kwargs:
+            values['title'] = kwargs['title']
+        if 'access_type' in kwargs:
+            values['access_type'] = AccessType(kwargs['access_type'])
+        if 'metadata' in kwargs:
+            values['metadata'] = kwargs['metadata']
+        
+        # Single UPDATE ... RETURNING; no row back means no such channel
         result = await session.execute(
-            select(Channel).where(Channel.telegram_id == telegram_id)
+            update(Channel).where(Channel.telegram_id == telegram_id).values(**values).returning(Channel.id)
         )
-        channel = result.scalar_one_or_none()
         
-        if not channel:
+        if result.scalar_one_or_none() is None:
             return {
                 'success': False,
                 'message': f'Channel {telegram_id} not found'
             }
         
-        # Update allowed fields
-        if 'title' in kwargs:
-            channel.title = kwargs['title']
-        if 'access_type' in kwargs:
-            channel.access_type = AccessType(kwargs['access_type'])
-        if 'metadata' in kwargs:
-            channel.metadata = kwargs['metadata']
-        
         await session.commit()
         
         return {
@@ -235,18 +426,14 @@ class AdminCommands:
     
     async def _toggle_channel(self, session, telegram_id: int, active: bool) -> Dict[str, Any]:
         """Activate or deactivate a channel."""
-        result = await session.execute(
-            select(Channel).where(Channel.telegram_id == telegram_id)
-        )
-        channel = result.scalar_one_or_none()
+        result = await session.execute(_TOGGLE_CHANNEL_STMT, {'channel_tid': telegram_id, 'active': active})
         
-        if not channel:
+        if result.scalar_one_or_none() is None:
             return {
                 'success': False,
                 'message': f'Channel {telegram_id} not found'
             }
         
-        channel.is_active = active
         await session.commit()
         
         status = "activated" if active else "deactivated"
@@ -262,54 +449,36 @@ class AdminCommands:
             await init_database()
             
             async with get_db_session() as session:
-                # Get source and destination channels
-                source_result = await session.execute(
-                    select(Channel).where(Channel.telegram_id == source_id)
-                )
-                source_channel = source_result.scalar_one_or_none()
-                
-                dest_result = await session.execute(
-                    select(Channel).where(Channel.telegram_id == dest_id)
-                )
-                dest_channel = dest_result.scalar_one_or_none()
+                # Lookups, duplicate check and insert in a single round trip
+                result = await session.execute(_CREATE_MAPPING_STMT, {
+                    'source_tid': source_id,
+                    'dest_tid': dest_id,
+                    'mode': ForwardingMode(mode),
+                    'enabled': enabled
+                })
+                row = result.one()
                 
-                if not source_channel:
+                if row.source_channel_id is None:
                     return {
                         'success': False,
                         'message': f'Source channel {source_id} not found'
                     }
                 
-                if not dest_channel:
+                if row.dest_channel_id is None:
                     return {
                         'success': False,
                         'message': f'Destination channel {dest_id} not found'
                     }
                 
-                # Check if mapping already exists
-                existing_result = await session.execute(
-                    select(ForwardingMapping).where(
-                        ForwardingMapping.source_channel_id == source_channel.id,
-                        ForwardingMapping.dest_channel_id == dest_channel.id
-                    )
-                )
-                existing_mapping = existing_result.scalar_one_or_none()
-                
-                if existing_mapping:
+                # Both channels exist, so no new row means the mapping already did
+                if row.mapping_id is None:
                     return {
                         'success': False,
                         'message': f'Mapping from {source_id} to {dest_id} already exists'
                     }
                 
-                # Create new mapping
-                mapping = ForwardingMapping(
-                    source_channel_id=source_channel.id,
-                    dest_channel_id=dest_channel.id,
-                    mode=ForwardingMode(mode),
-                    enabled=enabled
-                )
-                
-                session.add(mapping)
                 await session.commit()
+                self.invalidate_stats()
                 
                 return {
                     'success': True,
@@ -322,8 +491,6 @@ class AdminCommands:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            await close_database()
     
     async def cleanup_old_data(self, days_old: int = 30) -> Dict[str, Any]:
         """Clean up old message logs and deduplication cache entries."""
@@ -338,23 +505,19 @@ class AdminCommands:
             
             async with get_db_session() as session:
                 # Clean up old successful message logs
-                message_result = await session.execute(
-                    delete(MessageLog).where(
-                        MessageLog.created_at < cutoff_date,
-                        MessageLog.status == MessageStatus.SUCCESS
-                    )
+                cleanup_stats['message_logs_deleted'] = await _delete_in_batches(
+                    session, MessageLog,
+                    MessageLog.created_at < cutoff_date,
+                    MessageLog.status == MessageStatus.SUCCESS
                 )
-                cleanup_stats['message_logs_deleted'] = message_result.rowcount
                 
                 # Clean up old deduplication cache entries
-                dedup_result = await session.execute(
-                    delete(DeduplicationCache).where(
-                        DeduplicationCache.created_at < cutoff_date
-                    )
+                cleanup_stats['dedup_cache_deleted'] = await _delete_in_batches(
+                    session, DeduplicationCache,
+                    DeduplicationCache.created_at < cutoff_date
                 )
-                cleanup_stats['dedup_cache_deleted'] = dedup_result.rowcount
-                
-                await session.commit()
+            
+            self.invalidate_stats()
             
             return {
                 'success': True,
@@ -368,58 +531,51 @@ class AdminCommands:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            await close_database()
     
     async def get_system_stats(self) -> Dict[str, Any]:
-        """Get comprehensive system statistics."""
+        """Get comprehensive system statistics, reusing a recent successful result."""
+        async with self._stats_lock:
+            if self._stats is not None and time.monotonic() - self._stats_at < self._STATS_TTL:
+                return self._stats
+            
+            stats_result = await self._fetch_system_stats()
+            if stats_result['success']:
+                self._stats = stats_result
+                self._stats_at = time.monotonic()
+            return stats_result
+    
+    async def _fetch_system_stats(self) -> Dict[str, Any]:
+        """Query comprehensive system statistics."""
         try:
             await init_database()
             
+            recent_cutoff = datetime.utcnow() - timedelta(hours=24)
+            
             async with get_db_session() as session:
-                # Basic counts
-                user_count = await session.execute(select(func.count(User.id)))
-                channel_count = await session.execute(select(func.count(Channel.id)))
-                mapping_count = await session.execute(select(func.count(ForwardingMapping.id)))
-                
-                # Active mappings
-                active_mappings = await session.execute(
-                    select(func.count(ForwardingMapping.id)).where(ForwardingMapping.enabled == True)
-                )
-                
-                # Recent message activity (last 24 hours)
-                recent_cutoff = datetime.utcnow() - timedelta(hours=24)
-                recent_messages = await session.execute(
-                    select(MessageLog.status, func.count(MessageLog.id))
-                    .where(MessageLog.created_at >= recent_cutoff)
-                    .group_by(MessageLog.status)
-                )
-                recent_stats = dict(recent_messages.all())
-                
-                # Channel access types
-                access_types = await session.execute(
-                    select(Channel.access_type, func.count(Channel.id))
-                    .group_by(Channel.access_type)
-                )
-                access_stats = dict(access_types.all())
-                
-                # Forwarding modes
-                forwarding_modes = await session.execute(
-                    select(ForwardingMapping.mode, func.count(ForwardingMapping.id))
-                    .group_by(ForwardingMapping.mode)
-                )
-                mode_stats = dict(forwarding_modes.all())
+                # Counts and group-by breakdowns in a single round trip; totals are
+                # planner estimates on large tables, and the breakdowns come back
+                # as ready-made {enum value: count} JSON objects
+                result = await session.execute(select(
+                    approx_row_count(User).label('users'),
+                    approx_row_count(Channel).label('channels'),
+                    approx_row_count(ForwardingMapping).label('mappings'),
+                    _count(ForwardingMapping.id, ForwardingMapping.enabled == True).label('active_mappings'),
+                    _grouped_counts(MessageLog.status, MessageLog.created_at >= recent_cutoff).label('recent'),
+                    _grouped_counts(Channel.access_type).label('access'),
+                    _grouped_counts(ForwardingMapping.mode).label('modes')
+                ))
+                stats = result.one()
                 
                 return {
                     'success': True,
                     'stats': {
-                        'total_users': user_count.scalar(),
-                        'total_channels': channel_count.scalar(),
-                        'total_mappings': mapping_count.scalar(),
-                        'active_mappings': active_mappings.scalar(),
-                        'recent_24h_messages': {status.value: count for status, count in recent_stats.items()},
-                        'channels_by_access': {access.value: count for access, count in access_stats.items()},
-                        'mappings_by_mode': {mode.value: count for mode, count in mode_stats.items()},
+                        'total_users': stats.users,
+                        'total_channels': stats.channels,
+                        'total_mappings': stats.mappings,
+                        'active_mappings': stats.active_mappings,
+                        'recent_24h_messages': stats.recent,
+                        'channels_by_access': stats.access,
+                        'mappings_by_mode': stats.modes,
                         'generated_at': datetime.utcnow().isoformat()
                     }
                 }
@@ -430,8 +586,6 @@ class AdminCommands:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            await close_database()
     
     async def reset_failed_messages(self, max_age_hours: int = 24) -> Dict[str, Any]:
         """Reset failed messages for retry."""
@@ -441,23 +595,36 @@ class AdminCommands:
             cutoff_date = datetime.utcnow() - timedelta(hours=max_age_hours)
             
             async with get_db_session() as session:
-                # Reset failed messages to pending for retry
-                result = await session.execute(
-                    update(MessageLog)
-                    .where(
-                        MessageLog.status == MessageStatus.FAILED,
-                        MessageLog.created_at >= cutoff_date,
-                        MessageLog.attempts < 3  # Don't retry if already at max attempts
+                # Reset failed messages to pending for retry, a committed batch at a
+                # time; rows the forwarder holds locked are skipped, not waited on
+                reset_count = 0
+                while True:
+                    batch_ids = (
+                        select(MessageLog.id)
+                        .where(
+                            MessageLog.status == MessageStatus.FAILED,
+                            MessageLog.created_at >= cutoff_date,
+                            MessageLog.attempts < 3  # Don't retry if already at max attempts
+                        )
+                        .limit(RESET_BATCH_SIZE)
+                        .with_for_update(skip_locked=True)
                     )
-                    .values(
-                        status=MessageStatus.PENDING,
-                        last_error=None,
-                        updated_at=datetime.utcnow()
+                    result = await session.execute(
+                        update(MessageLog)
+                        .where(MessageLog.id.in_(batch_ids))
+                        .values(
+                            status=MessageStatus.PENDING,
+                            last_error=None,
+                            updated_at=func.now()
+                        )
                     )
-                )
+                    await session.commit()
+                    
+                    reset_count += result.rowcount
+                    if result.rowcount < RESET_BATCH_SIZE:
+                        break
                 
-                reset_count = result.rowcount
-                await session.commit()
+                self.invalidate_stats()
                 
                 return {
                     'success': True,
@@ -471,5 +638,3 @@ class AdminCommands:
                 'success': False,
                 'error': str(e)
             }
-        finally:
-            await close_database()
@@ -3,15 +3,37 @@ Migration management commands for database transitions and data validation.
 """
 import logging
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 from datetime import datetime
 
+from sqlalchemy import delete, func, select, text
+
 from src.migration import SQLiteMigrator, DataValidator
-from src.database import init_database, close_database
+from src.database import (
+    init_database, close_database, db_manager, get_db_session,
+    MessageLog, DeduplicationCache, LegacyFolder, LegacyList
+)
+from src.management.admin_commands import approx_row_count
 from src.config import settings
 
 logger = logging.getLogger(__name__)
 
+# High-churn tables worth vacuuming after cleanups
+MAINTENANCE_TABLES = (MessageLog.__tablename__, DeduplicationCache.__tablename__)
+
+
+def _build_purge_migrated_stmt():
+    """Delete migrated legacy folders and lists in one statement, returning both counts."""
+    folders = delete(LegacyFolder).where(LegacyFolder.migrated == True).returning(LegacyFolder.id).cte('deleted_folders')
+    lists = delete(LegacyList).where(LegacyList.migrated == True).returning(LegacyList.id).cte('deleted_lists')
+    return select(
+        select(func.count()).select_from(folders).scalar_subquery().label('folders_deleted'),
+        select(func.count()).select_from(lists).scalar_subquery().label('lists_deleted')
+    )
+
+
+_PURGE_MIGRATED_STMT = _build_purge_migrated_stmt()
+
 
 class MigrationCommands:
     """Management commands for database migration operations."""
@@ -55,8 +77,6 @@ class MigrationCommands:
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
-        finally:
-            await close_database()
     
     async def validate_migration(self) -> Dict[str, Any]:
         """Validate migration integrity and data consistency."""
@@ -76,31 +96,25 @@ class MigrationCommands:
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
-        finally:
-            await close_database()
     
     async def get_migration_status(self) -> Dict[str, Any]:
         """Get current migration status and statistics."""
         try:
-            await init_database()
-            
-            # Get basic migration info
+            # Read-only, so no init_database()/create_all; sessions come from the pool
             status = await self.migrator.get_migration_status()
             
             # Add database statistics
-            from sqlalchemy import select, func
-            from src.database import get_db_session, User, Channel, ForwardingMapping
+            from src.database import User, Channel, ForwardingMapping
             
             async with get_db_session() as session:
-                user_count = await session.execute(select(func.count(User.id)))
-                channel_count = await session.execute(select(func.count(Channel.id)))
-                mapping_count = await session.execute(select(func.count(ForwardingMapping.id)))
+                # All three counts in a single round trip, estimated on large tables
+                result = await session.execute(select(
+                    approx_row_count(User).label('users'),
+                    approx_row_count(Channel).label('channels'),
+                    approx_row_count(ForwardingMapping).label('mappings')
+                ))
                 
-                status['database_stats'] = {
-                    'users': user_count.scalar(),
-                    'channels': channel_count.scalar(),
-                    'mappings': mapping_count.scalar()
-                }
+                status['database_stats'] = dict(result.one()._mapping)
             
             return status
             
@@ -110,8 +124,6 @@ class MigrationCommands:
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
-        finally:
-            await close_database()
     
     async def generate_health_report(self) -> Dict[str, Any]:
         """Generate comprehensive system health report."""
@@ -131,8 +143,6 @@ class MigrationCommands:
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
-        finally:
-            await close_database()
     
     async def cleanup_migration_data(self) -> Dict[str, Any]:
         """Clean up temporary migration data and optimize database."""
@@ -141,22 +151,16 @@ class MigrationCommands:
         try:
             await init_database()
             
-            from src.database import get_db_session, LegacyFolder, LegacyList
-            from sqlalchemy import delete
-            
             async with get_db_session() as session:
-                # Mark legacy data as migrated
-                await session.execute(
-                    delete(LegacyFolder).where(LegacyFolder.migrated == True)
-                )
-                await session.execute(
-                    delete(LegacyList).where(LegacyList.migrated == True)
-                )
+                # Drop legacy data that has been migrated; both tables in one round trip
+                result = await session.execute(_PURGE_MIGRATED_STMT)
+                purged = dict(result.one()._mapping)
                 
                 await session.commit()
             
             # Run database maintenance
             cleanup_stats = await self._run_database_maintenance()
+            cleanup_stats.update(purged)
             
             return {
                 'success': True,
@@ -172,24 +176,23 @@ class MigrationCommands:
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
-        finally:
-            await close_database()
     
-    async def _run_database_maintenance(self) -> Dict[str, Any]:
+    async def _run_database_maintenance(self, tables: Sequence[str] = MAINTENANCE_TABLES) -> Dict[str, Any]:
         """Run database maintenance operations."""
-        from src.database import get_db_session
+        # VACUUM can't run inside a transaction block, so use an autocommit
+        # connection rather than a session
+        async with db_manager.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            quote = conn.dialect.identifier_preparer.quote
+            for table in tables:
+                # VACUUM ANALYZE also refreshes the planner statistics
+                await conn.execute(text(f"VACUUM (ANALYZE) {quote(table)}"))
         
-        async with get_db_session() as session:
-            # Run VACUUM and ANALYZE equivalent operations
-            await session.execute("VACUUM ANALYZE;")
-            
-            # Update table statistics
-            await session.execute("ANALYZE;")
-            
-            return {
-                'maintenance_completed': True,
-                'operations': ['vacuum', 'analyze']
-            }
+        return {
+            'maintenance_completed': True,
+            'operations': ['vacuum', 'analyze'],
+            'tables': list(tables)
+        }
 
 
 # CLI-style command functions for direct execution
@@ -259,6 +262,14 @@ async def show_status():
     return status
 
 
+async def _run_and_close(command):
+    """Run one CLI command, then release the shared connection pool."""
+    try:
+        return await command
+    finally:
+        await close_database()
+
+
 if __name__ == "__main__":
     import sys
     
@@ -271,14 +282,14 @@ if __name__ == "__main__":
     
     if command == "migrate":
         sqlite_path = sys.argv[2] if len(sys.argv) > 2 else None
-        asyncio.run(run_migration(sqlite_path))
+        asyncio.run(_run_and_close(run_migration(sqlite_path)))
     elif command == "validate":
-        asyncio.run(run_validation())
+        asyncio.run(_run_and_close(run_validation()))
     elif command == "status":
-        asyncio.run(show_status())
+        asyncio.run(_run_and_close(show_status()))
     elif command == "health":
         commands = MigrationCommands()
-        result = asyncio.run(commands.generate_health_report())
+        result = asyncio.run(_run_and_close(commands.generate_health_report()))
         print(f"🏥 Health Report: {result['overall_status']}")
     else:
         print(f"Unknown command: {command}")
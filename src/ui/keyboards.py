@@ -2,6 +2,7 @@
 Inline keyboard components for the Telegram bot interface.
 Provides modern, intuitive UI elements for navigation and interaction.
 """
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Callable
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from dataclasses import dataclass
@@ -68,6 +69,8 @@ class PaginationInfo:
     total_pages: int
     items_per_page: int
     total_items: int
+    # Keyset cursor for the next page (last id shown), None on the last page
+    next_after_id: Optional[int] = None
 
 
 class KeyboardBuilder:
@@ -169,18 +172,17 @@ class ChannelKeyboards:
             
             builder.add_row(row_buttons)
         
-        # Pagination controls
-        if pagination.total_pages > 1:
+        # Pagination controls (keyset: Next carries the last id shown)
+        if pagination.current_page > 0 or pagination.next_after_id is not None:
             builder.new_row()
             if pagination.current_page > 0:
-                builder.add_button("⬅️ Prev", 
-                    f"{CallbackAction.PAGE_PREV.value}:{CallbackAction.CHANNELS_LIST.value}:{pagination.current_page-1}")
+                builder.add_button("⏮ First", f"{CallbackAction.CHANNELS_LIST.value}:0")
             
             builder.add_button(f"{pagination.current_page + 1}/{pagination.total_pages}", "noop")
             
-            if pagination.current_page < pagination.total_pages - 1:
+            if pagination.next_after_id is not None:
                 builder.add_button("Next ➡️", 
-                    f"{CallbackAction.PAGE_NEXT.value}:{CallbackAction.CHANNELS_LIST.value}:{pagination.current_page+1}")
+                    f"{CallbackAction.CHANNELS_LIST.value}:{pagination.next_after_id}:page:{pagination.current_page+1}")
         
         # Action buttons for admins
         if user_role == UserRole.ADMINISTRATOR:
@@ -255,27 +257,27 @@ class MappingKeyboards:
             status_icon = "✅" if mapping.enabled else "❌"
             mode_icon = "📤" if mapping.mode.value == "forward" else "📋"
             
-            source_title = mapping.source_channel.title[:15] if mapping.source_channel else "Unknown"
-            dest_title = mapping.dest_channel.title[:15] if mapping.dest_channel else "Unknown"
+            source_title = mapping.source_title[:15] if mapping.source_title else "Unknown"
+            dest_title = mapping.dest_title[:15] if mapping.dest_title else "Unknown"
             
             text = f"{status_icon}{mode_icon} {source_title} → {dest_title}"
             callback = f"{CallbackAction.MAPPING_VIEW.value}:{mapping.id}"
             
             builder.add_row([(text, callback)])
         
-        # Pagination controls
-        if pagination.total_pages > 1:
+        # Pagination controls (keyset: Next carries the last id shown)
+        if pagination.current_page > 0 or pagination.next_after_id is not None:
             builder.new_row()
             if pagination.current_page > 0:
-                prev_callback = f"{CallbackAction.PAGE_PREV.value}:{CallbackAction.MAPPINGS_LIST.value}:{pagination.current_page-1}"
+                first_callback = f"{CallbackAction.MAPPINGS_LIST.value}:0"
                 if channel_filter:
-                    prev_callback += f":channel:{channel_filter}"
-                builder.add_button("⬅️ Prev", prev_callback)
+                    first_callback += f":channel:{channel_filter}"
+                builder.add_button("⏮ First", first_callback)
             
             builder.add_button(f"{pagination.current_page + 1}/{pagination.total_pages}", "noop")
             
-            if pagination.current_page < pagination.total_pages - 1:
-                next_callback = f"{CallbackAction.PAGE_NEXT.value}:{CallbackAction.MAPPINGS_LIST.value}:{pagination.current_page+1}"
+            if pagination.next_after_id is not None:
+                next_callback = f"{CallbackAction.MAPPINGS_LIST.value}:{pagination.next_after_id}:page:{pagination.current_page+1}"
                 if channel_filter:
                     next_callback += f":channel:{channel_filter}"
                 builder.add_button("Next ➡️", next_callback)
@@ -493,11 +495,20 @@ class MultiSelectKeyboard:
 # Utility functions for callback data parsing
 def parse_callback_data(callback_data: str) -> Dict[str, Any]:
     """Parse callback data into components."""
+    # Keyboards reuse a small set of callback strings, so parse each one once
+    result = dict(_parse_callback_data(callback_data))
+    result['params'] = list(result['params'])
+    return result
+
+
+@lru_cache(maxsize=4096)
+def _parse_callback_data(callback_data: str) -> Dict[str, Any]:
+    """Parse callback data; cached, so the result must not be mutated."""
     parts = callback_data.split(':')
     
     result = {
         'action': parts[0] if parts else None,
-        'params': parts[1:] if len(parts) > 1 else []
+        'params': tuple(parts[1:])
     }
     
     # Parse common patterns
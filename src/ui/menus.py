@@ -2,6 +2,7 @@
 Menu components and message formatters for the Telegram bot interface.
 Provides consistent message formatting and menu structures.
 """
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from telegram import InlineKeyboardMarkup
@@ -20,12 +21,16 @@ class MenuFormatter:
     def format_main_menu(user: User) -> tuple[str, InlineKeyboardMarkup]:
         """Format the main menu message and keyboard."""
         greeting = f"👋 Welcome, {user.username or 'User'}!"
+        body, keyboard = MenuFormatter._main_menu_body(user.role)
+        return greeting + body, keyboard
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _main_menu_body(role: UserRole) -> tuple[str, InlineKeyboardMarkup]:
+        """Build the role-dependent part of the main menu once per role."""
+        suffix = " (Administrator)" if role == UserRole.ADMINISTRATOR else ""
         
-        if user.role == UserRole.ADMINISTRATOR:
-            greeting += " (Administrator)"
-        
-        message = f"""
-{greeting}
+        message = f"""{suffix}
 
 🤖 **Telegram Forwarding Bot**
 
@@ -37,13 +42,13 @@ Choose an option from the menu below:
 📋 **Lists** - View and manage forwarding lists
 ⚙️ **Settings** - Configure your preferences
 
-{f"🛠️ **Admin Panel** - System administration" if user.role == UserRole.ADMINISTRATOR else ""}
+{f"🛠️ **Admin Panel** - System administration" if role == UserRole.ADMINISTRATOR else ""}
 
 🔄 Use the refresh button to update data
         """
         
-        keyboard = MainMenuKeyboard.create(user.role)
-        return message.strip(), keyboard
+        keyboard = MainMenuKeyboard.create(role)
+        return message.rstrip(), keyboard
     
     @staticmethod
     def format_channels_list(channels: List[Channel], pagination: PaginationInfo, 
@@ -188,6 +193,7 @@ Select a mapping to view details:
         return message.strip(), keyboard
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def format_admin_panel() -> tuple[str, InlineKeyboardMarkup]:
         """Format the admin panel message and keyboard."""
         message = """
@@ -253,6 +259,7 @@ Try refreshing or check system logs for more details.
         return message.strip(), keyboard
     
     @staticmethod
+    @lru_cache(maxsize=None)
     def format_settings_menu(user_role: UserRole = UserRole.USER) -> tuple[str, InlineKeyboardMarkup]:
         """Format the settings menu message and keyboard."""
         message = """